@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Columnar export of l0_extract_qwen35.py run artifacts.
+Purpose:
+1) Read l0_candidates.jsonl (+ submit_results.jsonl) from one run dir or a --manifest run root.
+2) Flatten verifier decisions, drafts and temperature_c/time_min/ph/water_activity ranges.
+3) Write candidates and citations tables with a fixed schema as Parquet or Arrow IPC (Feather v2).
+Requires pyarrow (optional dependency: pip install pyarrow).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from l0_extract_qwen35 import PARAM_KEYS, candidate_ref, parse_l0_id  # noqa: E402
+
+RANGE_KEYS = [k for k in PARAM_KEYS if k != "other"]
+
+# (name, arrow type) pairs; bump SCHEMA_VERSION whenever a column changes.
+SCHEMA_VERSION = "1"
+CANDIDATE_COLUMNS: List[Tuple[str, str]] = (
+    [
+        ("book_id", "string"),
+        ("chunk_id", "string"),
+        ("idx", "int32"),
+        ("decision", "string"),
+        ("reason", "string"),
+        ("duplicate_of", "string"),
+        ("principle_key", "string"),
+        ("claim", "string"),
+        ("mechanism", "string"),
+        ("confidence", "float64"),
+        ("evidence_level", "string"),
+    ]
+    + [(f"{k}_{end}", "float64") for k in RANGE_KEYS for end in ("min", "max")]
+    + [
+        ("other_params", "string"),
+        ("boundary_conditions", "list<string>"),
+        ("citations", "int32"),
+        ("submitted", "bool"),
+        ("l0_id", "int64"),
+        ("submit_detail", "string"),
+    ]
+)
+CITATION_COLUMNS: List[Tuple[str, str]] = [
+    ("book_id", "string"),
+    ("chunk_id", "string"),
+    ("idx", "int32"),
+    ("l0_id", "int64"),
+    ("source_title", "string"),
+    ("source_type", "string"),
+    ("reliability_tier", "string"),
+    ("source_uri", "string"),
+    ("locator", "string"),
+    ("evidence_snippet", "string"),
+]
+
+
+def arrow_schema(pa: Any, columns: List[Tuple[str, str]]) -> Any:
+    types = {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "list<string>": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[t]) for name, t in columns], metadata={"l0_export_schema": SCHEMA_VERSION})
+
+
+def as_float(v: Any) -> Optional[float]:
+    if isinstance(v, bool) or v is None:
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def as_int32(v: Any) -> Optional[int]:
+    """Integral value (int, "3", 3.0) that fits the int32 column, else None."""
+    f = as_float(v)
+    if f is None or not f.is_integer() or not -(2**31) <= f < 2**31:
+        return None
+    return int(f)
+
+
+def find_runs(root: Path) -> List[Tuple[str, Path]]:
+    """(book_id, run_dir) pairs: the dir itself for a single-book run, else its per-book subdirs."""
+    if (root / "l0_candidates.jsonl").exists():
+        book_id = root.name
+        manifest = root / "chunk_manifest.json"
+        if manifest.exists():
+            try:
+                book_id = str(json.loads(manifest.read_text(encoding="utf-8")).get("book_id") or book_id)
+            except ValueError:
+                pass
+        return [(book_id, root)]
+    return sorted((d.name, d) for d in root.iterdir() if (d / "l0_candidates.jsonl").exists())
+
+
+def load_submits(path: Path) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    out: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    if not path.exists():
+        return out
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+                idx = as_int32(rec["idx"])
+                if idx is not None:
+                    out[(str(rec["chunk_id"]), idx)] = rec
+            except (ValueError, KeyError, TypeError):
+                continue
+    return out
+
+
+def canonical_l0_ids(runs: List[Tuple[str, Path]]) -> Dict[str, int]:
+    """candidate ref ("book_id:chunk_id#idx") -> l0_id of every inserted draft across the runs."""
+    out: Dict[str, int] = {}
+    for book_id, run_dir in runs:
+        for (chunk_id, idx), rec in load_submits(run_dir / "submit_results.jsonl").items():
+            l0_id = parse_l0_id(str(rec.get("detail") or "")) if rec.get("ok") else None
+            if l0_id is not None:
+                out[candidate_ref(book_id, chunk_id, idx)] = l0_id
+    return out
+
+
+def iter_rows(
+    book_id: str, run_dir: Path, skipped: Counter[str], canonical: Dict[str, int]
+) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Yield (candidate row, citation rows) per candidate line of one run dir.
+
+    Citations of a near-duplicate were merged into its canonical draft, so they carry the
+    canonical's l0_id (from `canonical`; refs without a book id are from older single-book runs).
+    Lines that are not a JSON object or lack an integral idx are counted in `skipped` by reason.
+    """
+    submits = load_submits(run_dir / "submit_results.jsonl")
+    with (run_dir / "l0_candidates.jsonl").open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                cand = json.loads(line)
+            except ValueError:
+                skipped["bad_json"] += 1
+                continue
+            if not isinstance(cand, dict):
+                skipped["bad_json"] += 1
+                continue
+            idx = as_int32(cand.get("idx"))
+            if idx is None:
+                skipped["bad_idx"] += 1
+                continue
+            draft = cand.get("draft") if isinstance(cand.get("draft"), dict) else {}
+            verdict = cand.get("verifier") if isinstance(cand.get("verifier"), dict) else {}
+            chunk_id = str(cand.get("chunk_id") or "")
+            sub = submits.get((chunk_id, idx))
+            l0_id = parse_l0_id(str(sub.get("detail") or "")) if sub and sub.get("ok") else None
+            params = draft.get("control_variables") if isinstance(draft.get("control_variables"), dict) else {}
+            row: Dict[str, Any] = {
+                "book_id": book_id,
+                "chunk_id": chunk_id,
+                "idx": idx,
+                "decision": verdict.get("decision"),
+                "reason": verdict.get("reason"),
+                "duplicate_of": cand.get("duplicate_of"),
+                "principle_key": draft.get("principle_key"),
+                "claim": draft.get("claim"),
+                "mechanism": draft.get("mechanism"),
+                "confidence": as_float(draft.get("confidence")),
+                "evidence_level": draft.get("evidence_level"),
+            }
+            for k in RANGE_KEYS:
+                rng = params.get(k) if isinstance(params.get(k), dict) else {}
+                row[f"{k}_min"] = as_float(rng.get("min"))
+                row[f"{k}_max"] = as_float(rng.get("max"))
+            other = params.get("other")
+            raw_cites = draft.get("citations")
+            cites = [c for c in raw_cites if isinstance(c, dict)] if isinstance(raw_cites, list) else []
+            boundaries = draft.get("boundary_conditions")
+            dup = cand.get("duplicate_of")
+            cite_l0_id = (canonical.get(str(dup)) or canonical.get(f"{book_id}:{dup}")) if dup else l0_id
+            row.update(
+                other_params=json.dumps(other, ensure_ascii=False) if other else None,
+                boundary_conditions=[str(b) for b in boundaries] if isinstance(boundaries, list) else [],
+                citations=len(cites),
+                submitted=bool(sub and sub.get("ok")),
+                l0_id=l0_id,
+                submit_detail=sub.get("detail") if sub else None,
+            )
+            cite_rows = [
+                {
+                    "book_id": book_id,
+                    "chunk_id": chunk_id,
+                    "idx": idx,
+                    "l0_id": cite_l0_id,
+                    "source_title": c.get("source_title"),
+                    "source_type": c.get("source_type"),
+                    "reliability_tier": c.get("reliability_tier"),
+                    "source_uri": c.get("source_uri"),
+                    "locator": c.get("locator"),
+                    "evidence_snippet": c.get("evidence_snippet"),
+                }
+                for c in cites
+            ]
+            yield row, cite_rows
+
+
+class TableSink:
+    """Buffers rows and appends them to one Parquet/Arrow file in record batches."""
+
+    def __init__(self, pa: Any, path: Path, columns: List[Tuple[str, str]], fmt: str, batch_rows: int) -> None:
+        self.pa = pa
+        self.schema = arrow_schema(pa, columns)
+        self.names = [name for name, _ in columns]
+        self.batch_rows = batch_rows
+        self.rows: List[Dict[str, Any]] = []
+        self.written = 0
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(str(path), self.schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_file(str(path), self.schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        arrays = [self.pa.array([r.get(n) for r in self.rows], type=self.schema.field(n).type) for n in self.names]
+        batch = self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if hasattr(self.writer, "write_batch"):
+            self.writer.write_batch(batch)
+        else:
+            self.writer.write(batch)
+        self.written += len(self.rows)
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Export L0 candidates and citations to Parquet/Arrow")
+    p.add_argument("--run-dir", action="append", required=True, help="extractor --out-dir (single or --manifest run); repeatable")
+    p.add_argument("--out-dir", default="", help="destination (default: <first run dir>/columnar)")
+    p.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    p.add_argument("--batch-rows", type=int, default=50000)
+    args = p.parse_args()
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("fatal: pyarrow is required for columnar export (pip install pyarrow)", file=sys.stderr)
+        return 2
+
+    runs: List[Tuple[str, Path]] = []
+    for raw in args.run_dir:
+        root = Path(raw)
+        if not root.is_dir():
+            print(f"fatal: run dir not found: {root}", file=sys.stderr)
+            return 2
+        runs.extend(find_runs(root))
+    if not runs:
+        print("fatal: no l0_candidates.jsonl under the given run dirs", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out_dir) if args.out_dir else Path(args.run_dir[0]) / "columnar"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ext = "parquet" if args.format == "parquet" else "arrow"
+    cand_path = out_dir / f"l0_candidates.{ext}"
+    cite_path = out_dir / f"l0_citations.{ext}"
+    candidates = TableSink(pa, cand_path, CANDIDATE_COLUMNS, args.format, max(1, args.batch_rows))
+    citations = TableSink(pa, cite_path, CITATION_COLUMNS, args.format, max(1, args.batch_rows))
+    skipped: Counter[str] = Counter()
+    canonical = canonical_l0_ids(runs)
+    try:
+        for book_id, run_dir in runs:
+            for row, cite_rows in iter_rows(book_id, run_dir, skipped, canonical):
+                candidates.add(row)
+                for c in cite_rows:
+                    citations.add(c)
+    finally:
+        candidates.close()
+        citations.close()
+
+    print(
+        json.dumps(
+            {
+                "books": [b for b, _ in runs],
+                "candidates": candidates.written,
+                "citations": citations.written,
+                "skipped_rows": dict(skipped),
+                "schema_version": SCHEMA_VERSION,
+                "candidates_out": str(cand_path),
+                "citations_out": str(cite_path),
+            },
+            ensure_ascii=False,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
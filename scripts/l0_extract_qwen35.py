@@ -2,7 +2,7 @@
 """
 Fresh L0 extractor (Qwen3.5 coding-plan endpoint).
 Purpose:
-1) Read book markdown by line ranges.
+1) Read book markdown and index its chapter/section headings (or fixed line ranges).
 2) Chunk text into extraction units.
 3) Call Qwen3.5 with strict L0 schema prompt.
 4) Save extraction artifacts.
@@ -12,17 +12,28 @@ Purpose:
 from __future__ import annotations
 
 import argparse
+import base64
+import email.utils
+import gzip
+import hashlib
+import http.client
+import itertools
 import json
 import os
+import random
 import re
 import sys
 import time
 import sqlite3
-import urllib.error
+import threading
+import urllib.parse
 import urllib.request
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
 
 
 SYSTEM_PROMPT = """你是食品科学知识工程师。只提取L0科学原理候选。
@@ -93,6 +104,23 @@ page_range={meta.get("page_range", "")}
 }}"""
 
 
+VERIFY_BATCH_SYSTEM_PROMPT = """你是L0科学原理审核员（Verifier）。
+任务：逐条审核多个候选是否满足L0发布最小标准。
+标准：
+1) 机理性陈述（why）；
+2) 至少一个可测参数；
+3) 因果关系成立；
+4) 有证据定位与短引；
+5) 有边界条件。
+每个候选都必须给出结果，index 与输入一致。
+输出仅JSON：{"results":[{"index":0,"decision":"pass|need_evidence|reject","reason":"..."}]}"""
+
+# Changes to any prompt text invalidate --resume checkpoints built with the old prompts.
+PROMPT_VERSION = hashlib.sha256(
+    "\x1f".join([SYSTEM_PROMPT, VERIFY_SYSTEM_PROMPT, VERIFY_BATCH_SYSTEM_PROMPT, user_prompt({}, "")]).encode("utf-8")
+).hexdigest()[:12]
+
+
 def verify_prompt(candidate: Dict[str, Any], meta: Dict[str, str]) -> str:
     return f"""请审核以下L0候选：
 
@@ -111,39 +139,126 @@ page_range={meta.get("page_range", "")}
   "reason":"一句话说明原因"
 }}"""
 
+
+def verify_batch_prompt(candidates: List[Dict[str, Any]], meta: Dict[str, str]) -> str:
+    items = [{"index": i, "candidate": cand} for i, cand in enumerate(candidates)]
+    return f"""请逐条审核以下{len(candidates)}个L0候选：
+
+元数据：
+book_title={meta.get("book_title", "")}
+chapter_id={meta.get("chapter_id", "")}
+section_id={meta.get("section_id", "")}
+page_range={meta.get("page_range", "")}
+
+候选JSON数组：
+{json.dumps(items, ensure_ascii=False)}
+
+输出JSON：
+{{
+  "results": [
+    {{"index": 0, "decision": "pass|need_evidence|reject", "reason": "一句话说明原因"}}
+  ]
+}}"""
+
+PARAM_KEYS = ("temperature_c", "time_min", "ph", "water_activity", "other")
+
+
+def _filled(v: Any) -> bool:
+    return v is not None and str(v).strip() != ""
+
+
 def _has_measurable_params(params: Dict[str, Any]) -> bool:
     if not isinstance(params, dict):
         return False
-    keys = ["temperature_c", "time_min", "ph", "water_activity", "other"]
-    for k in keys:
+    for k in PARAM_KEYS:
         v = params.get(k)
         if isinstance(v, dict):
-            for vv in v.values():
-                if vv is not None and str(vv).strip() != "":
-                    return True
-        elif v is not None and str(v).strip() != "":
+            if any(_filled(vv) for vv in v.values()):
+                return True
+        elif _filled(v):
             return True
     return False
 
 
-def rule_verify_candidate(candidate: Dict[str, Any]) -> Dict[str, str]:
-    statement = str(candidate.get("statement") or "").strip()
-    mechanism = str(candidate.get("mechanism") or "").strip()
-    cause_effect = str(candidate.get("cause_effect") or "").strip()
-    params = candidate.get("parameters") or {}
-    evidence = candidate.get("evidence") or {}
-    locator = str((evidence or {}).get("locator") or "").strip()
-    quote = str((evidence or {}).get("quote") or "").strip()
-    boundaries = candidate.get("boundary_conditions") or []
-    has_params = _has_measurable_params(params)
-    has_evidence = bool(locator) and bool(quote)
-    has_boundary = isinstance(boundaries, list) and len(boundaries) > 0
-    has_mechanism = bool(mechanism) or bool(cause_effect)
-    if not statement:
+class L0Candidate:
+    """One model-proposed principle, validated and normalized once.
+
+    Every consumer (rule verifier, dedup, draft builder) reads these fields instead of
+    re-walking the raw dict; `raw` is kept for the model verifier prompt.
+    """
+
+    __slots__ = (
+        "raw",
+        "statement",
+        "mechanism",
+        "cause_effect",
+        "parameters",
+        "has_params",
+        "boundaries",
+        "locator",
+        "quote",
+        "confidence",
+    )
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        get = raw.get
+        self.raw = raw
+        self.statement = str(get("statement") or "").strip()
+        self.mechanism = str(get("mechanism") or "").strip()
+        self.cause_effect = str(get("cause_effect") or "").strip()
+        params = get("parameters")
+        self.parameters: Dict[str, Any] = params if isinstance(params, dict) else {}
+        self.has_params = _has_measurable_params(self.parameters)
+        boundaries = get("boundary_conditions")
+        self.boundaries: Optional[List[Any]] = boundaries if isinstance(boundaries, list) and boundaries else None
+        evidence = get("evidence")
+        if not isinstance(evidence, dict):
+            evidence = {}
+        self.locator = str(evidence.get("locator") or "").strip()
+        self.quote = str(evidence.get("quote") or "").strip()
+        try:
+            conf = float(get("confidence"))
+        except (TypeError, ValueError):
+            conf = 0.6
+        self.confidence = max(0.0, min(1.0, conf))
+
+
+def as_candidate(candidate: Union[Dict[str, Any], L0Candidate]) -> L0Candidate:
+    return candidate if isinstance(candidate, L0Candidate) else L0Candidate(candidate)
+
+
+def parse_principles(parsed: Dict[str, Any]) -> List[Tuple[int, L0Candidate]]:
+    """(1-based index, candidate) for every dict entry of `principles`; other entries are skipped."""
+    principles = parsed.get("principles")
+    if not isinstance(principles, list):
+        return []
+    return [(i, L0Candidate(pp)) for i, pp in enumerate(principles, start=1) if isinstance(pp, dict)]
+
+
+def parse_non_l0(parsed: Dict[str, Any]) -> List[Dict[str, str]]:
+    """`non_l0_content` entries as {statement, reason} strings; entries without a statement are skipped."""
+    items = parsed.get("non_l0_content")
+    if not isinstance(items, list):
+        return []
+    out: List[Dict[str, str]] = []
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        statement = str(it.get("statement") or "").strip()
+        if statement:
+            out.append({"statement": statement, "reason": str(it.get("reason") or "").strip()})
+    return out
+
+
+def rule_verify_candidate(candidate: Union[Dict[str, Any], L0Candidate]) -> Dict[str, str]:
+    c = as_candidate(candidate)
+    has_evidence = bool(c.locator) and bool(c.quote)
+    has_mechanism = bool(c.mechanism) or bool(c.cause_effect)
+    if not c.statement:
         return {"decision": "reject", "reason": "missing statement"}
-    if not has_mechanism and not has_params and not has_evidence:
+    if not has_mechanism and not c.has_params and not has_evidence:
         return {"decision": "reject", "reason": "missing mechanism/params/evidence"}
-    if has_mechanism and has_params and has_evidence and has_boundary:
+    if has_mechanism and c.has_params and has_evidence and c.boundaries is not None:
         return {"decision": "pass", "reason": "rule check passed"}
     return {"decision": "need_evidence", "reason": "rule check incomplete fields"}
 
@@ -158,10 +273,21 @@ class Chunk:
     line_end: int
 
 
+FENCE_RE = re.compile(r"^```[a-zA-Z]*\n?")
+
+
 def extract_json_block(text: str) -> Dict[str, Any]:
     s = text.strip()
+    if s[:1] == "{" and s[-1:] == "}":
+        # Fast path: json_object responses are normally a bare object.
+        try:
+            out = json.loads(s)
+        except ValueError:
+            out = None
+        if isinstance(out, dict):
+            return out
     if s.startswith("```"):
-        s = re.sub(r"^```[a-zA-Z]*\n?", "", s)
+        s = FENCE_RE.sub("", s)
         if s.endswith("```"):
             s = s[:-3]
     start = s.find("{")
@@ -178,62 +304,562 @@ def to_snake_key(text: str) -> str:
     return t[:90] if t else "l0_candidate"
 
 
+CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+
+def estimate_tokens_heuristic(text: str) -> int:
+    """Offline token estimate: ~1 token per CJK character, ~4 characters per token otherwise."""
+    cjk = len(CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _tiktoken_estimator() -> Callable[[str], int]:
+    import tiktoken  # optional; only needed for --token-estimator tiktoken
+
+    enc = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(enc.encode(text, disallowed_special=()))
+
+
+TOKEN_ESTIMATORS: Dict[str, Callable[[], Callable[[str], int]]] = {
+    "heuristic": lambda: estimate_tokens_heuristic,
+    "tiktoken": _tiktoken_estimator,
+}
+
+
+def get_token_estimator(name: str) -> Callable[[str], int]:
+    if name not in TOKEN_ESTIMATORS:
+        raise ValueError(f"unknown token estimator: {name}")
+    return TOKEN_ESTIMATORS[name]()
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    s = sorted(values)
+    k = (len(s) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def distribution(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "min": min(values),
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "max": max(values),
+        "mean": round(sum(values) / len(values), 1),
+    }
+
+
+# Yield pre-scorer: quantities with units and causal connectives mark mechanism-bearing prose;
+# narrative, history and bare recipe steps score low.
+PARAM_TOKEN_RE = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:°\s*[CF]|℃|℉|%|％|ppm|mg|g/l|mmol|mol|ml|min(?:ute)?s?\b|h(?:ou)?rs?\b|sec(?:ond)?s?\b"
+    r"|克|毫克|毫升|分钟|小时|秒|度)"
+    r"|\bpH\b|pH值|水分活度|water activity",
+    re.I,
+)
+CAUSAL_RE = re.compile(
+    r"\b(?:because|therefore|thus|hence|caus(?:e|es|ed|ing)|leads? to|results? in|due to|so that|as a result"
+    r"|prevents?|promotes?|inhibits?|depends? on)\b"
+    r"|因为|由于|所以|因此|导致|使得|从而|引起|造成|促进|抑制|防止|取决于",
+    re.I,
+)
+
+
+def yield_score(text: str) -> float:
+    """Predicted principle yield of a chunk: parameter and causal hits per 1000 chars (capped).
+
+    A ranking signal only; it is not calibrated to a principle count.
+    """
+    if not text:
+        return 0.0
+    scale = 1000 / max(len(text), 200)
+    params = min(len(PARAM_TOKEN_RE.findall(text)) * scale, 10.0)
+    causal = min(len(CAUSAL_RE.findall(text)) * scale, 10.0)
+    return round(0.6 * params + causal, 3)
+
+
+def _ranks(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2
+        i = j + 1
+    return ranks
+
+
+def spearman(xs: List[float], ys: List[float]) -> Optional[float]:
+    if len(xs) < 3:
+        return None
+    rx, ry = _ranks(xs), _ranks(ys)
+    mx, my = sum(rx) / len(rx), sum(ry) / len(ry)
+    cov = sum((a - mx) * (b - my) for a, b in zip(rx, ry))
+    var = (sum((a - mx) ** 2 for a in rx) * sum((b - my) ** 2 for b in ry)) ** 0.5
+    return round(cov / var, 3) if var else None
+
+
 def read_lines(path: Path) -> List[str]:
     return path.read_text(encoding="utf-8", errors="ignore").splitlines()
 
 
-def chunk_lines(lines: List[str], chapter_ranges: List[Tuple[str, int, int]], target_chars: int = 5200) -> List[Chunk]:
+def _chunk_range(
+    numbered: Iterable[Tuple[int, str]],
+    chapter_id: str,
+    start_i: int,
+    end_i: int,
+    target_chars: int,
+    measure: Callable[[str], int] = len,
+) -> Iterator[Chunk]:
+    """Pack (line_no, line) pairs of one chapter range into chunks, splitting on blank lines
+    once the buffer exceeds target_chars as counted by `measure` (characters by default)."""
+    buffer: List[str] = []
+    cur_start = start_i
+    cur_len = 0
+    section_idx = 1
+    for i, line in numbered:
+        ln = measure(line) + 1
+        if cur_len > target_chars and line.strip() == "":
+            text = "\n".join(buffer).strip()
+            if text:
+                yield Chunk(
+                    chunk_id=f"{chapter_id}_s{section_idx:03d}",
+                    chapter_id=chapter_id,
+                    section_id=f"{chapter_id}.sec{section_idx:03d}",
+                    text=text,
+                    line_start=cur_start,
+                    line_end=i,
+                )
+                section_idx += 1
+            buffer = []
+            cur_start = i + 1
+            cur_len = 0
+            continue
+        buffer.append(line)
+        cur_len += ln
+    tail = "\n".join(buffer).strip()
+    if tail:
+        yield Chunk(
+            chunk_id=f"{chapter_id}_s{section_idx:03d}",
+            chapter_id=chapter_id,
+            section_id=f"{chapter_id}.sec{section_idx:03d}",
+            text=tail,
+            line_start=cur_start,
+            line_end=end_i,
+        )
+
+
+def chunk_lines(
+    lines: List[str],
+    chapter_ranges: List[Tuple[str, int, int]],
+    target_chars: int = 5200,
+    target_tokens: int = 0,
+    estimator: Callable[[str], int] = estimate_tokens_heuristic,
+) -> List[Chunk]:
+    """Split chapter ranges into chunks of ~target_chars, or ~target_tokens when that is set."""
+    budget, measure = (target_tokens, estimator) if target_tokens > 0 else (target_chars, len)
     chunks: List[Chunk] = []
     for chapter_id, start, end in chapter_ranges:
         start_i = max(1, start)
         end_i = min(len(lines), end)
         if end_i < start_i:
             continue
-        buffer: List[str] = []
-        cur_start = start_i
-        cur_len = 0
-        section_idx = 1
-        for i in range(start_i, end_i + 1):
-            line = lines[i - 1]
-            ln = len(line) + 1
-            if cur_len > target_chars and line.strip() == "":
-                text = "\n".join(buffer).strip()
-                if text:
-                    chunk_id = f"{chapter_id}_s{section_idx:03d}"
-                    chunks.append(
-                        Chunk(
-                            chunk_id=chunk_id,
-                            chapter_id=chapter_id,
-                            section_id=f"{chapter_id}.sec{section_idx:03d}",
-                            text=text,
-                            line_start=cur_start,
-                            line_end=i,
-                        )
-                    )
-                    section_idx += 1
-                buffer = []
-                cur_start = i + 1
-                cur_len = 0
-                continue
-            buffer.append(line)
-            cur_len += ln
-        tail = "\n".join(buffer).strip()
-        if tail:
-            chunk_id = f"{chapter_id}_s{section_idx:03d}"
-            chunks.append(
-                Chunk(
-                    chunk_id=chunk_id,
-                    chapter_id=chapter_id,
-                    section_id=f"{chapter_id}.sec{section_idx:03d}",
-                    text=tail,
-                    line_start=cur_start,
-                    line_end=end_i,
-                )
-            )
+        numbered = ((i, lines[i - 1]) for i in range(start_i, end_i + 1))
+        chunks.extend(_chunk_range(numbered, chapter_id, start_i, end_i, budget, measure))
     return chunks
 
 
-def chat_qwen(base_url: str, api_key: str, model: str, sys_prompt: str, usr_prompt: str, timeout_sec: int = 120) -> Dict[str, Any]:
+def iter_file_lines(f: TextIO) -> Iterator[str]:
+    """Stream lines with the same boundaries as read_lines (str.splitlines), without loading the file."""
+    for raw in f:
+        for line in raw.splitlines():
+            yield line
+
+
+def iter_chunks_from_file(
+    path: Path,
+    chapter_ranges: List[Tuple[str, int, int]],
+    target_chars: int = 5200,
+    target_tokens: int = 0,
+    estimator: Callable[[str], int] = estimate_tokens_heuristic,
+) -> Iterator[Chunk]:
+    """Streaming chunk_lines: yields the same chunks while holding at most one chunk of text.
+
+    Ranges in ascending order are served in a single pass; a range that starts before the
+    current position rewinds the file.
+    """
+    budget, measure = (target_tokens, estimator) if target_tokens > 0 else (target_chars, len)
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        lines = iter_file_lines(f)
+        pos = 0  # number of lines consumed so far
+        for chapter_id, start, end in chapter_ranges:
+            start_i = max(1, start)
+            if end < start_i:
+                continue
+            if start_i <= pos:
+                f.seek(0)
+                lines = iter_file_lines(f)
+                pos = 0
+            for _ in itertools.islice(lines, start_i - 1 - pos):
+                pos += 1
+            if pos < start_i - 1:
+                continue  # file ends before this range
+
+            last = start_i - 1
+
+            def numbered() -> Iterator[Tuple[int, str]]:
+                nonlocal last
+                for i, line in zip(range(start_i, end + 1), lines):
+                    last = i
+                    yield i, line
+
+            for c in _chunk_range(numbered(), chapter_id, start_i, end, budget, measure):
+                if c.line_end == end and last < end:
+                    c.line_end = last  # tail of a range that runs past EOF, as in chunk_lines
+                yield c
+            pos = last
+
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+CHAPTER_TITLE_RE = re.compile(
+    r"^(?:chapter\s+(?:\d+|[ivxlc]+)\b|第\s*[0-9一二三四五六七八九十百零〇]+\s*章|\d{1,2}\.?\s+\D)",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class Heading:
+    line_no: int
+    level: int
+    title: str
+    numbered_chapter: bool
+
+
+@dataclass
+class Paragraph:
+    line_start: int
+    line_end: int
+    text: str
+    chapter_id: str
+    section_no: int
+
+
+def build_heading_index(path: Path) -> List[Heading]:
+    """One pass over the markdown collecting `#` headings; fenced code blocks are ignored."""
+    index: List[Heading] = []
+    in_fence = False
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        for i, line in enumerate(iter_file_lines(f), start=1):
+            s = line.strip()
+            if s.startswith("```"):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+            m = HEADING_RE.match(s)
+            if m:
+                title = m.group(2).strip()
+                index.append(Heading(i, len(m.group(1)), title, bool(CHAPTER_TITLE_RE.match(title))))
+    return index
+
+
+def outline_from_index(index: List[Heading]) -> Dict[int, Tuple[str, str]]:
+    """Map heading line -> ("chapter", chapter_id) | ("section", "").
+
+    Chapters are the numbered-chapter headings ("Chapter 3", "第三章", "3 Meat") when the book
+    has any, otherwise the shallowest heading level. Sections are the next level below.
+    """
+    if not index:
+        return {}
+    numbered = [h for h in index if h.numbered_chapter]
+    if numbered:
+        chapter_level = min(h.level for h in numbered)
+        chapters = [h for h in numbered if h.level == chapter_level]
+    else:
+        chapter_level = min(h.level for h in index)
+        chapters = [h for h in index if h.level == chapter_level]
+    chapter_lines = {h.line_no for h in chapters}
+    deeper = sorted({h.level for h in index if h.level > chapter_level})
+    section_level = deeper[0] if deeper else None
+    outline: Dict[int, Tuple[str, str]] = {}
+    n = 0
+    for h in index:
+        if h.line_no in chapter_lines:
+            n += 1
+            outline[h.line_no] = ("chapter", f"ch{n:02d}")
+        elif h.level == section_level and n > 0:
+            outline[h.line_no] = ("section", "")
+    return outline
+
+
+def iter_paragraphs(path: Path, outline: Dict[int, Tuple[str, str]]) -> Iterator[Paragraph]:
+    """Stream blank-line separated paragraphs tagged with chapter/section.
+
+    Text before the first chapter heading (title page, contents) is skipped; a book without
+    any headings is treated as a single chapter "ch01".
+    """
+    chapter_id = "" if any(kind == "chapter" for kind, _ in outline.values()) else "ch01"
+    section_no = 0
+    buf: List[str] = []
+    start = 0
+    prev = 0
+
+    def flush(end: int) -> Iterator[Paragraph]:
+        text = "\n".join(buf).strip()
+        if text and chapter_id:
+            yield Paragraph(start, end, text, chapter_id, section_no)
+
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        for i, line in enumerate(iter_file_lines(f), start=1):
+            mark = outline.get(i)
+            if mark is not None or line.strip() == "":
+                yield from flush(prev)
+                buf = []
+            if mark is not None:
+                if mark[0] == "chapter":
+                    chapter_id, section_no = mark[1], 0
+                else:
+                    section_no += 1
+            if line.strip() != "":
+                if not buf:
+                    start = i
+                buf.append(line)
+            prev = i
+        yield from flush(prev)
+
+
+def parse_ranges(raw: str) -> List[Tuple[str, int, int]]:
+    ranges: List[Tuple[str, int, int]] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        m = re.fullmatch(r"([\w.-]+):(\d+)-(\d+)", part)
+        if not m:
+            raise ValueError(part)
+        ranges.append((m.group(1), int(m.group(2)), int(m.group(3))))
+    return ranges
+
+
+def iter_structured_chunks(
+    path: Path,
+    target_chars: int = 1800,
+    overlap_paragraphs: int = 0,
+    measure: Callable[[str], int] = len,
+    chapters: Optional[List[str]] = None,
+) -> Iterator[Chunk]:
+    """Heading-driven chunker: packs whole paragraphs up to `target_chars` (as counted by `measure`).
+
+    Chunks never cross a chapter. A section boundary closes the current chunk once it is at
+    least half full, so small sections are packed together instead of becoming tiny requests.
+    When a chunk is closed for size, its last `overlap_paragraphs` paragraphs are repeated at
+    the start of the next one.
+    """
+    outline = outline_from_index(build_heading_index(path))
+    budget = max(1, target_chars)
+    paras: List[Paragraph] = []
+    fresh = 0  # index in `paras` of the first paragraph not carried over as overlap
+    size = 0
+    seq: Dict[Tuple[str, int], int] = {}
+
+    def emit() -> Chunk:
+        head = paras[fresh] if fresh < len(paras) else paras[0]
+        k = (head.chapter_id, head.section_no)
+        seq[k] = seq.get(k, 0) + 1
+        return Chunk(
+            chunk_id=f"{head.chapter_id}_s{head.section_no:03d}_{seq[k]:02d}",
+            chapter_id=head.chapter_id,
+            section_id=f"{head.chapter_id}.sec{head.section_no:03d}",
+            text="\n\n".join(p.text for p in paras),
+            line_start=paras[0].line_start,
+            line_end=paras[-1].line_end,
+        )
+
+    for para in iter_paragraphs(path, outline):
+        if chapters and para.chapter_id not in chapters:
+            continue
+        cost = measure(para.text) + 2
+        if paras and fresh < len(paras):
+            new_chapter = para.chapter_id != paras[-1].chapter_id
+            new_section = para.section_no != paras[-1].section_no and size * 2 >= budget
+            if new_chapter or new_section or size + cost > budget:
+                yield emit()
+                keep = paras[-overlap_paragraphs:] if overlap_paragraphs > 0 and not (new_chapter or new_section) else []
+                if len(keep) == len(paras) or sum(measure(p.text) + 2 for p in keep) + cost > budget:
+                    keep = []
+                paras, fresh = list(keep), len(keep)
+                size = sum(measure(p.text) + 2 for p in keep)
+        paras.append(para)
+        size += cost
+    if paras and fresh < len(paras):
+        yield emit()
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        super().__init__(f"HTTP {status}: {body[:200].decode('utf-8', errors='ignore')}")
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+
+class HttpClient:
+    """Keep-alive HTTP(S) client shared by every request in a run (thread-safe).
+
+    Idle connections are pooled per (scheme, host, port); a reused connection that the
+    server already closed is retried once on a fresh one. Responses are requested with
+    gzip, and request bodies are gzipped when gzip_requests is set.
+    Proxies are taken from the environment like urllib does (HTTP(S)_PROXY, NO_PROXY):
+    https goes through a CONNECT tunnel, plain http is forwarded with absolute-URL requests.
+    """
+
+    def __init__(self, gzip_requests: bool = False, max_idle_per_host: int = 16) -> None:
+        self.gzip_requests = gzip_requests
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._proxies = urllib.request.getproxies()
+        self._routes: Dict[Tuple[str, str, int], Optional[Tuple[str, int, Dict[str, str]]]] = {}
+        self.handshakes = 0
+        self.requests = 0
+        self.proxied = 0
+        self.latencies_ms: List[float] = []
+
+    def _proxy(self, key: Tuple[str, str, int]) -> Optional[Tuple[str, int, Dict[str, str]]]:
+        """(proxy host, proxy port, proxy auth headers) for this origin, or None to connect directly."""
+        with self._lock:
+            if key in self._routes:
+                return self._routes[key]
+        scheme, host, _ = key
+        route = None
+        raw = self._proxies.get(scheme)
+        if raw and not urllib.request.proxy_bypass(host):
+            pu = urllib.parse.urlsplit(raw if "://" in raw else f"http://{raw}")
+            auth: Dict[str, str] = {}
+            if pu.username:
+                cred = f"{urllib.parse.unquote(pu.username)}:{urllib.parse.unquote(pu.password or '')}"
+                auth["Proxy-Authorization"] = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+            route = (pu.hostname or "", pu.port or 80, auth)
+        with self._lock:
+            self._routes[key] = route
+        return route
+
+    def _acquire(self, key: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            self.handshakes += 1
+        scheme, host, port = key
+        proxy = self._proxy(key)
+        if proxy is None:
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=timeout), False
+            return http.client.HTTPConnection(host, port, timeout=timeout), False
+        phost, pport, auth = proxy
+        if scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(phost, pport, timeout=timeout)
+            conn.set_tunnel(host, port, headers=auth or None)
+            return conn, False
+        return http.client.HTTPConnection(phost, pport, timeout=timeout), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self, method: str, url: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None, timeout: float = 30
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one request; returns (status, lower-cased headers, decoded body). Never raises on HTTP status."""
+        u = urllib.parse.urlsplit(url)
+        scheme = u.scheme or "http"
+        key = (scheme, u.hostname or "", u.port or (443 if scheme == "https" else 80))
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        hdrs = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        proxy = self._proxy(key)
+        if proxy is not None and scheme == "http":
+            path = f"http://{key[1]}:{key[2]}{path}"  # forward proxy wants the absolute URL
+            hdrs.update(proxy[2])
+        hdrs.update(headers or {})
+        if body is not None and self.gzip_requests:
+            body = gzip.compress(body)
+            hdrs["Content-Encoding"] = "gzip"
+        t0 = time.perf_counter()
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=hdrs)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # stale keep-alive connection
+                raise
+            except Exception:
+                conn.close()
+                raise
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            if resp_headers.get("content-encoding", "").lower() == "gzip":
+                data = gzip.decompress(data)
+            with self._lock:
+                self.requests += 1
+                self.proxied += int(proxy is not None)
+                self.latencies_ms.append((time.perf_counter() - t0) * 1000)
+            return resp.status, resp_headers, data
+        raise RuntimeError("unreachable")
+
+    def close(self) -> None:
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = list(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "handshakes": self.handshakes,
+            "proxied": self.proxied,
+            "latency_ms": {k: (round(v, 1) if isinstance(v, float) else v) for k, v in distribution(lat).items()},
+        }
+
+
+DEFAULT_HTTP = HttpClient()
+
+
+def chat_qwen(
+    base_url: str,
+    api_key: str,
+    model: str,
+    sys_prompt: str,
+    usr_prompt: str,
+    timeout_sec: int = 120,
+    client: Optional[HttpClient] = None,
+) -> Dict[str, Any]:
     url = f"{base_url.rstrip('/')}/chat/completions"
     payload = {
         "model": model,
@@ -246,117 +872,262 @@ def chat_qwen(base_url: str, api_key: str, model: str, sys_prompt: str, usr_prom
         ],
     }
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url=url,
-        data=data,
-        method="POST",
+    status, headers, body = (client or DEFAULT_HTTP).request(
+        "POST",
+        url,
+        body=data,
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         },
+        timeout=timeout_sec,
     )
-    with urllib.request.urlopen(req, timeout=timeout_sec) as resp:
-        out = json.loads(resp.read().decode("utf-8", errors="ignore"))
-    return out
+    if status >= 400:
+        raise HttpError(status, body, headers)
+    return json.loads(body.decode("utf-8", errors="ignore"))
 
 
-def post_local_draft(submit_url: str, payload: Dict[str, Any]) -> Tuple[bool, str]:
+def post_local_draft(submit_url: str, payload: Dict[str, Any], client: Optional[HttpClient] = None) -> Tuple[bool, str]:
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url=submit_url,
-        data=data,
-        method="POST",
-        headers={"Content-Type": "application/json"},
-    )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            body = resp.read().decode("utf-8", errors="ignore")
-            return True, body[:200]
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="ignore")
-        return False, f"HTTP {e.code}: {body[:200]}"
+        status, _, body = (client or DEFAULT_HTTP).request(
+            "POST", submit_url, body=data, headers={"Content-Type": "application/json"}, timeout=30
+        )
     except Exception as e:
         return False, str(e)
+    text = body.decode("utf-8", errors="ignore")
+    if status >= 400:
+        return False, f"HTTP {status}: {text[:200]}"
+    return True, text[:200]
 
 
-def submit_draft_sqlite(db_path: str, payload: Dict[str, Any], status: str = "DRAFT") -> Tuple[bool, str]:
-    try:
-        con = sqlite3.connect(db_path)
-        cur = con.cursor()
-        cur.execute(
-            "SELECT COALESCE(MAX(version), 0) + 1 FROM l0_principles WHERE principle_key = ?",
-            (payload["principle_key"],),
+L0_PRINCIPLE_COLUMNS = (
+    "id, principle_key, version, status, claim, mechanism, "
+    "control_variables, expected_effects, boundary_conditions, counter_examples, "
+    "evidence_level, confidence, change_reason, proposer"
+)
+L0_CITATION_COLUMNS = "l0_id, source_title, source_type, reliability_tier, source_uri, locator, evidence_snippet"
+
+
+class SqliteDraftWriter:
+    """Long-lived l0_engine.db writer that inserts many drafts per transaction.
+
+    Keeps a principle_key -> max(version) map in memory; if another writer (the Next.js app)
+    bumps a version in between, the UNIQUE(principle_key, version) conflict triggers a
+    refresh of the affected keys and one retry.
+    """
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = 10000) -> None:
+        self.con = sqlite3.connect(db_path, timeout=busy_timeout_ms / 1000, isolation_level=None)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.versions: Dict[str, int] = dict(
+            self.con.execute("SELECT principle_key, MAX(version) FROM l0_principles GROUP BY principle_key").fetchall()
         )
-        next_version = int(cur.fetchone()[0])
-        cur.execute(
-            """
-            INSERT INTO l0_principles (
-              principle_key, version, status, claim, mechanism,
-              control_variables, expected_effects, boundary_conditions, counter_examples,
-              evidence_level, confidence, change_reason, proposer
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        self.principles = 0
+        self.citations = 0
+        self.transactions = 0
+        self.write_sec = 0.0
+
+    def __enter__(self) -> "SqliteDraftWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def _next_id(self) -> int:
+        row = self.con.execute(
+            "SELECT MAX(COALESCE((SELECT MAX(id) FROM l0_principles), 0),"
+            " COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'l0_principles'), 0))"
+        ).fetchone()
+        return int(row[0]) + 1
+
+    def _refresh_versions(self, keys: List[str]) -> None:
+        for k in set(keys):
+            row = self.con.execute("SELECT MAX(version) FROM l0_principles WHERE principle_key = ?", (k,)).fetchone()
+            if row and row[0] is not None:
+                self.versions[k] = int(row[0])
+
+    def _insert(self, items: List[Tuple[Dict[str, Any], str]], sources: Optional[List[str]] = None) -> List[Tuple[bool, str]]:
+        results: List[Tuple[bool, str]] = [(False, "")] * len(items)
+        versions = dict(self.versions)
+        p_rows: List[Tuple[Any, ...]] = []
+        c_rows: List[Tuple[Any, ...]] = []
+        l_rows: List[Tuple[str, int]] = []
+        self.con.execute("BEGIN IMMEDIATE")
+        try:
+            next_id = self._next_id()
+            for i, (payload, status) in enumerate(items):
+                try:
+                    key = payload["principle_key"]
+                    version = versions.get(key, 0) + 1
+                    row = (
+                        next_id,
+                        key,
+                        version,
+                        status,
+                        payload["claim"],
+                        payload["mechanism"],
+                        json.dumps(payload.get("control_variables", {}), ensure_ascii=False),
+                        json.dumps(payload.get("expected_effects", []), ensure_ascii=False),
+                        json.dumps(payload.get("boundary_conditions", []), ensure_ascii=False),
+                        json.dumps(payload.get("counter_examples", []), ensure_ascii=False),
+                        payload.get("evidence_level", "medium"),
+                        float(payload.get("confidence", 0.7)),
+                        payload["change_reason"],
+                        payload["proposer"],
+                    )
+                    cites = [
+                        (
+                            next_id,
+                            c.get("source_title", ""),
+                            c.get("source_type", "book"),
+                            c.get("reliability_tier", "A"),
+                            c.get("source_uri"),
+                            c.get("locator"),
+                            c.get("evidence_snippet", ""),
+                        )
+                        for c in payload.get("citations", [])
+                    ]
+                except Exception as e:
+                    results[i] = (False, str(e))
+                    continue
+                versions[key] = version
+                p_rows.append(row)
+                c_rows.extend(cites)
+                if sources is not None:
+                    l_rows.append((sources[i], next_id))
+                results[i] = (True, f"inserted l0_id={next_id}")
+                next_id += 1
+            self.con.executemany(
+                f"INSERT INTO l0_principles ({L0_PRINCIPLE_COLUMNS}) VALUES ({', '.join('?' * 14)})", p_rows
+            )
+            self.con.executemany(f"INSERT INTO l0_citations ({L0_CITATION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", c_rows)
+            if l_rows:
+                self.con.executemany("INSERT INTO l0_import_ledger (source_key, l0_id) VALUES (?, ?)", l_rows)
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+        self.versions = versions
+        self.principles += len(p_rows)
+        self.citations += len(c_rows)
+        self.transactions += 1
+        return results
+
+    def write_citations(self, items: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """Add citations to existing principles in one transaction."""
+        rows = [
             (
-                payload["principle_key"],
-                next_version,
-                status,
-                payload["claim"],
-                payload["mechanism"],
-                json.dumps(payload.get("control_variables", {}), ensure_ascii=False),
-                json.dumps(payload.get("expected_effects", []), ensure_ascii=False),
-                json.dumps(payload.get("boundary_conditions", []), ensure_ascii=False),
-                json.dumps(payload.get("counter_examples", []), ensure_ascii=False),
-                payload.get("evidence_level", "medium"),
-                float(payload.get("confidence", 0.7)),
-                payload["change_reason"],
-                payload["proposer"],
-            ),
-        )
-        l0_id = cur.lastrowid
-        for c in payload.get("citations", []):
-            cur.execute(
-                """
-                INSERT INTO l0_citations (
-                  l0_id, source_title, source_type, reliability_tier, source_uri, locator, evidence_snippet
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    l0_id,
-                    c.get("source_title", ""),
-                    c.get("source_type", "book"),
-                    c.get("reliability_tier", "A"),
-                    c.get("source_uri"),
-                    c.get("locator"),
-                    c.get("evidence_snippet", ""),
-                ),
+                l0_id,
+                c.get("source_title", ""),
+                c.get("source_type", "book"),
+                c.get("reliability_tier", "A"),
+                c.get("source_uri"),
+                c.get("locator"),
+                c.get("evidence_snippet", ""),
             )
-        con.commit()
-        con.close()
-        return True, f"inserted l0_id={l0_id}"
-    except Exception as e:
-        return False, str(e)
+            for l0_id, c in items
+        ]
+        t0 = time.perf_counter()
+        try:
+            self.con.execute("BEGIN IMMEDIATE")
+            self.con.executemany(f"INSERT INTO l0_citations ({L0_CITATION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.con.execute("COMMIT")
+        except Exception:
+            if self.con.in_transaction:
+                self.con.execute("ROLLBACK")
+            return False
+        finally:
+            self.write_sec += time.perf_counter() - t0
+        self.citations += len(rows)
+        self.transactions += 1
+        return True
+
+    def write_batch(self, items: List[Tuple[Dict[str, Any], str]], sources: Optional[List[str]] = None) -> List[Tuple[bool, str]]:
+        """Insert (payload, status) drafts in one transaction; returns (ok, detail) per item.
+
+        With `sources` (one key per item), each inserted row is also recorded in l0_import_ledger
+        within the same transaction.
+        """
+        if not items:
+            return []
+        t0 = time.perf_counter()
+        try:
+            try:
+                return self._insert(items, sources)
+            except sqlite3.IntegrityError:
+                self._refresh_versions([str(payload.get("principle_key")) for payload, _ in items])
+                return self._insert(items, sources)
+        except Exception as e:
+            return [(False, str(e))] * len(items)
+        finally:
+            self.write_sec += time.perf_counter() - t0
 
+    def supersede(self, l0_ids: List[int], reviewer: str, note: str) -> Tuple[List[int], List[int]]:
+        """Reject unreviewed (DRAFT/NEED_EVIDENCE) rows among `l0_ids` in one transaction.
 
-def build_l0_draft(book_title: str, chunk: Chunk, p: Dict[str, Any], proposer: str) -> Dict[str, Any]:
-    statement = str(p.get("statement") or "").strip()
-    mechanism = str(p.get("mechanism") or "").strip()
-    evidence = p.get("evidence") or {}
-    quote = str((evidence or {}).get("quote") or "").strip()
-    locator = str((evidence or {}).get("locator") or f"{chunk.chapter_id}:{chunk.line_start}-{chunk.line_end}").strip()
-    confidence = p.get("confidence")
+        Returns (rejected_ids, kept_ids); rows already READY/PUBLISHED/REJECTED are left for a human.
+        """
+        if not l0_ids:
+            return [], []
+        t0 = time.perf_counter()
+        marks = ", ".join("?" * len(l0_ids))
+        try:
+            self.con.execute("BEGIN IMMEDIATE")
+            rejected = [
+                int(r[0])
+                for r in self.con.execute(
+                    f"SELECT id FROM l0_principles WHERE id IN ({marks}) AND status IN ('DRAFT', 'NEED_EVIDENCE')", l0_ids
+                ).fetchall()
+            ]
+            self.con.executemany(
+                "UPDATE l0_principles SET status = 'REJECTED', reviewer = ?, review_note = ?, reviewed_at = datetime('now')"
+                " WHERE id = ?",
+                [(reviewer, note, i) for i in rejected],
+            )
+            self.con.execute("COMMIT")
+        except Exception:
+            if self.con.in_transaction:
+                self.con.execute("ROLLBACK")
+            raise
+        finally:
+            self.write_sec += time.perf_counter() - t0
+        self.transactions += 1
+        done = set(rejected)
+        return rejected, [i for i in l0_ids if i not in done]
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.principles + self.citations
+        return {
+            "principles": self.principles,
+            "citations": self.citations,
+            "transactions": self.transactions,
+            "rows_per_sec": round(rows / self.write_sec, 1) if self.write_sec > 0 else None,
+        }
+
+
+def submit_draft_sqlite(db_path: str, payload: Dict[str, Any], status: str = "DRAFT") -> Tuple[bool, str]:
     try:
-        conf = float(confidence)
-    except Exception:
-        conf = 0.6
-    conf = max(0.0, min(1.0, conf))
+        with SqliteDraftWriter(db_path) as writer:
+            return writer.write_batch([(payload, status)])[0]
+    except Exception as e:
+        return False, str(e)
 
-    boundaries = p.get("boundary_conditions")
-    if not isinstance(boundaries, list) or len(boundaries) == 0:
-        boundaries = [f"source_locator={locator}"]
 
-    params = p.get("parameters")
-    if not isinstance(params, dict):
-        params = {}
+def build_l0_draft(
+    book_title: str, chunk: Chunk, p: Union[Dict[str, Any], L0Candidate], proposer: str
+) -> Dict[str, Any]:
+    c = as_candidate(p)
+    statement = c.statement
+    mechanism = c.mechanism
+    quote = c.quote
+    locator = c.locator or f"{chunk.chapter_id}:{chunk.line_start}-{chunk.line_end}"
+    boundaries = c.boundaries or [f"source_locator={locator}"]
 
     key_seed = statement if statement else mechanism
     principle_key = to_snake_key(key_seed)
@@ -368,11 +1139,11 @@ def build_l0_draft(book_title: str, chunk: Chunk, p: Dict[str, Any], proposer: s
         "claim": statement[:500] if statement else f"candidate from {chunk.chunk_id}",
         "mechanism": mechanism[:1200] if mechanism else "pending mechanism completion",
         "boundary_conditions": boundaries,
-        "control_variables": params,
+        "control_variables": c.parameters,
         "expected_effects": [],
         "counter_examples": [],
         "evidence_level": "medium",
-        "confidence": conf,
+        "confidence": c.confidence,
         "change_reason": f"auto extraction from {book_title} {chunk.chapter_id} lines {chunk.line_start}-{chunk.line_end}",
         "proposer": proposer,
         "citations": [
@@ -387,9 +1158,1385 @@ def build_l0_draft(book_title: str, chunk: Chunk, p: Dict[str, Any], proposer: s
     }
 
 
+class RateLimiter:
+    """Shared requests-per-second gate for all model calls in a run (thread-safe)."""
+
+    def __init__(self, rps: float) -> None:
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def retry_after_sec(headers: Dict[str, str]) -> Optional[float]:
+    raw = (headers.get("retry-after") or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(raw).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Pauses every caller after `threshold` consecutive transient failures.
+
+    While open, before_call() blocks until the cooldown (or a longer Retry-After) has passed.
+    The next call is a trial: one more failure reopens the breaker straight away.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown_sec: float = 30.0) -> None:
+        self.threshold = threshold
+        self.cooldown_sec = cooldown_sec
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self.opens = 0
+
+    def before_call(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._open_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self, pause_sec: Optional[float] = None) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            now = time.monotonic()
+            if self._failures >= self.threshold and self._open_until <= now:
+                self._open_until = now + max(self.cooldown_sec, pause_sec or 0.0)
+                self.opens += 1
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient model-endpoint failures.
+
+    Only network errors and 408/425/429/5xx responses are retried; a Retry-After header
+    overrides the computed delay. Everything else (4xx, bad JSON) fails immediately.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_sec: float = 1.0,
+        max_sec: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_sec = base_sec
+        self.max_sec = max_sec
+        self.breaker = breaker or CircuitBreaker(threshold=0)
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.throttled = 0
+
+    @staticmethod
+    def is_retryable(e: Exception) -> bool:
+        if isinstance(e, HttpError):
+            return e.status in RETRYABLE_STATUS
+        return isinstance(e, (OSError, http.client.HTTPException))
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_sec, self.base_sec * (2**attempt)))
+
+    def run(self, fn: Callable[[], Any]) -> Any:
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                out = fn()
+            except Exception as e:
+                if not self.is_retryable(e):
+                    raise
+                hinted = retry_after_sec(e.headers) if isinstance(e, HttpError) else None
+                if isinstance(e, HttpError) and e.status == 429:
+                    with self._lock:
+                        self.throttled += 1
+                self.breaker.record_failure(hinted)
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(min(self.max_sec, hinted) if hinted is not None else self.backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return out
+        raise RuntimeError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"retries": self.retries, "throttled_429": self.throttled, "breaker_opens": self.breaker.opens}
+
+
+class ResponseCache:
+    """Content-addressed SQLite cache of chat_qwen responses.
+
+    mode: "write" reads and stores, "read" only reads, "off" bypasses the cache.
+    Entries older than ttl_sec are ignored and dropped; once the stored payload exceeds
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Path, mode: str = "write", ttl_sec: float = 30 * 86400, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.mode = mode
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._con: Optional[sqlite3.Connection] = None
+        if mode == "off":
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._con = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+              key TEXT PRIMARY KEY,
+              model TEXT NOT NULL,
+              response TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              created_at REAL NOT NULL,
+              last_used REAL NOT NULL
+            )
+            """
+        )
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self._con.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl_sec,))
+        self._total = int(self._con.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0])
+
+    @staticmethod
+    def key(model: str, sys_prompt: str, usr_prompt: str) -> str:
+        h = hashlib.sha256()
+        for part in (model, sys_prompt, usr_prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x1f")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._con is None:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._con.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now - self.ttl_sec:
+                self.misses += 1
+                return None
+            self._con.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, response: Dict[str, Any]) -> None:
+        if self._con is None or self.mode != "write":
+            return
+        body = json.dumps(response, ensure_ascii=False)
+        size = len(body.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._con.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._con.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, body, size, now, now),
+            )
+            self._total += size - (int(old[0]) if old else 0)
+            self.stores += 1
+            if self._total > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target: int) -> None:
+        rows = self._con.execute("SELECT key, size FROM responses ORDER BY last_used ASC").fetchall()
+        doomed: List[Tuple[str]] = []
+        for k, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((k,))
+            self._total -= int(size)
+        self._con.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+
+ACCEPTED_DECISIONS = frozenset({"pass", "need_evidence"})
+
+
+def dedup_text(c: L0Candidate) -> str:
+    """The text near-duplicates are judged on, for live and resumed candidates alike."""
+    return c.statement or c.mechanism
+
+
+def candidate_ref(book_id: str, chunk_id: str, idx: int) -> str:
+    """Run-wide candidate id; chunk ids repeat across books, so refs carry the book id."""
+    return f"{book_id}:{chunk_id}#{idx}"
+
+
+def shingles(text: str, n: int = 4) -> Set[str]:
+    """Character n-grams of the punctuation/space-stripped, lower-cased text (works for CJK and English)."""
+    t = re.sub(r"[^0-9a-z\u4e00-\u9fff]+", "", text.lower())
+    if len(t) <= n:
+        return {t} if t else set()
+    return {t[i : i + n] for i in range(len(t) - n + 1)}
+
+
+class DedupIndex:
+    """In-run MinHash/LSH index of candidate statements for near-duplicate detection.
+
+    Only candidates the verifier accepted (pass / need_evidence) become canonical, so a
+    duplicate never points at a rejected row. Workers call match() before verification to
+    skip candidates that repeat an accepted one, and add_or_match() after verification to
+    index accepted candidates (or catch a duplicate accepted meanwhile by another worker).
+    The main thread uses `l0_ids`/`parked` to attach duplicate citations to the canonical
+    draft once it has been inserted.
+    """
+
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16) -> None:
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(1729)
+        self._perms = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME)) for _ in range(num_perm)]
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._entries: List[Tuple[str, Set[str]]] = []
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.duplicates = 0
+        self.citations_attached = 0
+        self.l0_ids: Dict[str, int] = {}
+        self.parked: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _signature(self, sh: Set[str]) -> List[int]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in sh]
+        return [min((a * h + b) % self.PRIME for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, sh: Set[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+        sig = self._signature(sh)
+        return [(b, tuple(sig[b * self.rows : (b + 1) * self.rows])) for b in range(self.bands)]
+
+    def _find(self, sh: Set[str], band_keys: List[Tuple[int, Tuple[int, ...]]]) -> Optional[Tuple[str, float]]:
+        """Caller holds the lock."""
+        seen: Set[int] = set()
+        for bk in band_keys:
+            for ei in self._buckets.get(bk, []):
+                if ei in seen:
+                    continue
+                seen.add(ei)
+                other_ref, other = self._entries[ei]
+                sim = len(sh & other) / len(sh | other)
+                if sim >= self.threshold:
+                    return other_ref, sim
+        return None
+
+    def match(self, text: str) -> Optional[Tuple[str, float]]:
+        """(canonical_ref, similarity) if `text` duplicates an indexed candidate; indexes nothing."""
+        if self.threshold <= 0:
+            return None
+        sh = shingles(text)
+        if not sh:
+            return None
+        band_keys = self._band_keys(sh)
+        with self._lock:
+            found = self._find(sh, band_keys)
+            if found is not None:
+                self.checked += 1
+                self.duplicates += 1
+        return found
+
+    def add_or_match(self, text: str, ref: str) -> Optional[Tuple[str, float]]:
+        """Return (canonical_ref, similarity) if `text` duplicates an earlier entry, else index it under `ref`."""
+        if self.threshold <= 0:
+            return None
+        sh = shingles(text)
+        if not sh:
+            return None
+        band_keys = self._band_keys(sh)
+        with self._lock:
+            self.checked += 1
+            found = self._find(sh, band_keys)
+            if found is not None:
+                self.duplicates += 1
+                return found
+            ei = len(self._entries)
+            self._entries.append((ref, sh))
+            for bk in band_keys:
+                self._buckets.setdefault(bk, []).append(ei)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "citations_attached": self.citations_attached,
+            "citations_unmerged": sum(len(v) for v in self.parked.values()),
+        }
+
+
+STAGES = ("chunking", "prompt", "extract", "verify", "draft", "submit")
+
+
+class ChunkMetrics:
+    """Wall time, model calls, `usage` tokens and errors of one chunk, per pipeline stage.
+
+    Filled by the worker that extracts the chunk, then by the main thread (chunking, submit).
+    """
+
+    def __init__(self, chunk_id: str, predicted_yield: float = 0.0) -> None:
+        self.chunk_id = chunk_id
+        self.predicted_yield = predicted_yield
+        self.candidates = 0
+        self.accepted = 0  # candidates the verifier did not reject or mark duplicate
+        self.stages: Dict[str, Dict[str, Any]] = {
+            s: {"sec": 0.0, "calls": 0, "cached": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            for s in STAGES
+        }
+
+    def add_time(self, stage: str, sec: float) -> None:
+        self.stages[stage]["sec"] += sec
+
+    def add_call(self, stage: str, res: Dict[str, Any], cached: bool = False) -> None:
+        st = self.stages[stage]
+        if cached:
+            st["cached"] += 1  # served locally: no tokens spent
+            return
+        st["calls"] += 1
+        usage = res.get("usage") or {}
+        st["prompt_tokens"] += int(usage.get("prompt_tokens") or 0)
+        st["completion_tokens"] += int(usage.get("completion_tokens") or 0)
+
+    def error(self, stage: str, n: int = 1) -> None:
+        self.stages[stage]["errors"] += n
+
+    def tokens(self) -> int:
+        return sum(st["prompt_tokens"] + st["completion_tokens"] for st in self.stages.values())
+
+    def record(self, chars: int) -> Dict[str, Any]:
+        return {
+            "chunk_id": self.chunk_id,
+            "chars": chars,
+            "predicted_yield": self.predicted_yield,
+            "candidates": self.candidates,
+            "accepted": self.accepted,
+            "sec": round(sum(st["sec"] for st in self.stages.values()), 4),
+            "stages": {s: dict(st, sec=round(st["sec"], 4)) for s, st in self.stages.items()},
+        }
+
+
+class RunMetrics:
+    """Aggregates ChunkMetrics into the end-of-run stage report.
+
+    Stage seconds are summed over chunks, so with --workers > 1 they can exceed wall time.
+    """
+
+    def __init__(self, price_prompt_per_1k: float = 0.0, price_completion_per_1k: float = 0.0) -> None:
+        self.price_prompt_per_1k = price_prompt_per_1k
+        self.price_completion_per_1k = price_completion_per_1k
+        self.totals = {s: {"sec": 0.0, "calls": 0, "cached": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0} for s in STAGES}
+        self.per_chunk_sec: Dict[str, List[float]] = {s: [] for s in STAGES}
+        self.predicted: List[float] = []
+        self.actual: List[int] = []
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    def add(self, m: ChunkMetrics) -> None:
+        self.chunks += 1
+        self.predicted.append(m.predicted_yield)
+        self.actual.append(m.accepted)
+        for s, st in m.stages.items():
+            for k, v in st.items():
+                self.totals[s][k] += v
+            self.per_chunk_sec[s].append(st["sec"] * 1000)
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        if self.price_prompt_per_1k <= 0 and self.price_completion_per_1k <= 0:
+            return None
+        return round(
+            prompt_tokens / 1000 * self.price_prompt_per_1k + completion_tokens / 1000 * self.price_completion_per_1k, 4
+        )
+
+    def yield_check(self) -> Dict[str, Any]:
+        """How well yield_score ranked chunks against accepted output (pass/need_evidence, not duplicates):
+        rank correlation and mean accepted candidates per predicted quartile."""
+        order = sorted(range(len(self.predicted)), key=lambda i: self.predicted[i])
+        quartiles = []
+        for q in range(4):
+            part = order[q * len(order) // 4 : (q + 1) * len(order) // 4]
+            quartiles.append(round(sum(self.actual[i] for i in part) / len(part), 2) if part else None)
+        return {
+            "chunks": len(self.predicted),
+            "spearman": spearman(self.predicted, [float(a) for a in self.actual]),
+            "zero_yield_chunks": sum(1 for a in self.actual if a == 0),
+            "mean_accepted_by_predicted_quartile": quartiles,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        busy = sum(t["sec"] for t in self.totals.values()) or 1.0
+        stages: Dict[str, Any] = {}
+        for s in STAGES:
+            t = self.totals[s]
+            stages[s] = dict(
+                t,
+                sec=round(t["sec"], 3),
+                share=round(t["sec"] / busy, 3),
+                chunk_ms={k: (round(v, 1) if isinstance(v, float) else v) for k, v in distribution(self.per_chunk_sec[s]).items()},
+                cost=self.cost(t["prompt_tokens"], t["completion_tokens"]),
+            )
+        prompt_tokens = sum(t["prompt_tokens"] for t in self.totals.values())
+        completion_tokens = sum(t["completion_tokens"] for t in self.totals.values())
+        return {
+            "chunks": self.chunks,
+            "wall_sec": round(time.perf_counter() - self.started, 3),
+            "stage_sec_total": round(sum(t["sec"] for t in self.totals.values()), 3),
+            "model_calls": sum(t["calls"] for t in self.totals.values()),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": self.cost(prompt_tokens, completion_tokens),
+            "stages": stages,
+            "yield": self.yield_check(),
+        }
+
+
+@dataclass
+class Runtime:
+    """Shared per-run services handed to every worker."""
+
+    limiter: RateLimiter
+    cache: ResponseCache
+    http: HttpClient
+    retry: RetryPolicy
+    dedup: DedupIndex
+    metrics: RunMetrics
+
+
+@dataclass
+class ChunkOutcome:
+    chunk: Chunk
+    raws: List[Dict[str, Any]]
+    candidates: List[Dict[str, Any]]
+    ok: bool
+    error: str = ""
+    submits: Optional[List[Dict[str, Any]]] = None  # set when carried over from a checkpoint
+    metrics: Optional[ChunkMetrics] = None  # None when carried over from a checkpoint
+
+
+RERANK_WINDOW = 256  # --budget: chunk texts held per re-read pass over the book
+
+
+def chunk_sha256(c: Chunk) -> str:
+    """Content hash of a chunk; unlike the checkpoint key it survives model/prompt changes."""
+    return hashlib.sha256(c.text.encode("utf-8")).hexdigest()
+
+
+def chunk_checkpoint_key(c: Chunk, model: str, verifier_mode: str) -> str:
+    h = hashlib.sha256()
+    for part in (PROMPT_VERSION, model, verifier_mode, c.text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def load_checkpoint(path: Path) -> Dict[str, Dict[str, Any]]:
+    done: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue  # torn last line from an interrupted run
+            if isinstance(rec, dict) and rec.get("key"):
+                done[rec["key"]] = rec
+    return done
+
+
+def outcome_from_checkpoint(c: Chunk, rec: Dict[str, Any]) -> ChunkOutcome:
+    """Rebuild a finished chunk's records, re-pointed at the chunk's current id and line range."""
+
+    def relabel(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        out = []
+        for item in items:
+            item = dict(item)
+            item["chunk_id"] = c.chunk_id
+            if "line_start" in item:
+                item["line_start"] = c.line_start
+                item["line_end"] = c.line_end
+            out.append(item)
+        return out
+
+    return ChunkOutcome(
+        chunk=c,
+        raws=relabel(rec.get("raws") or []),
+        candidates=relabel(rec.get("candidates") or []),
+        ok=True,
+        submits=relabel(rec.get("submits") or []),
+    )
+
+
+def response_text(res: Dict[str, Any]) -> str:
+    return (((res.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
+
+
+def call_model(
+    args: argparse.Namespace,
+    rt: Runtime,
+    sys_prompt: str,
+    usr_prompt: str,
+    timeout_sec: int,
+    metrics: Optional[ChunkMetrics] = None,
+    stage: str = "extract",
+) -> Dict[str, Any]:
+    """chat_qwen behind the response cache, rate limiter and retry policy; returns the parsed JSON body.
+
+    Responses are cached only once their JSON parses, so a malformed reply is never replayed.
+    The call and its `usage` tokens are counted against `stage` of `metrics` when given.
+    """
+    key = ResponseCache.key(args.model, sys_prompt, usr_prompt)
+    cached = rt.cache.get(key)
+    if cached is not None:
+        if metrics is not None:
+            metrics.add_call(stage, cached, cached=True)
+        return extract_json_block(response_text(cached))
+
+    def attempt() -> Dict[str, Any]:
+        rt.limiter.wait()
+        return chat_qwen(
+            args.base_url, args.api_key, args.model, sys_prompt, usr_prompt, timeout_sec=timeout_sec, client=rt.http
+        )
+
+    res = rt.retry.run(attempt)
+    if metrics is not None:
+        metrics.add_call(stage, res)
+    parsed = extract_json_block(response_text(res))
+    rt.cache.put(key, args.model, res)
+    return parsed
+
+
+def verify_with_qwen(
+    args: argparse.Namespace,
+    rt: Runtime,
+    pp: Dict[str, Any],
+    vmeta: Dict[str, str],
+    metrics: Optional[ChunkMetrics] = None,
+) -> Dict[str, Any]:
+    return call_model(args, rt, VERIFY_SYSTEM_PROMPT, verify_prompt(pp, vmeta), args.verify_timeout_sec, metrics, "verify")
+
+
+def verify_batch_with_qwen(
+    args: argparse.Namespace,
+    rt: Runtime,
+    batch: List[Dict[str, Any]],
+    vmeta: Dict[str, str],
+    metrics: Optional[ChunkMetrics] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """One verifier call for several candidates; entries with a missing or malformed result are None.
+
+    A reply that is not JSON at all leaves every entry None; request failures (transport, HTTP
+    status after retries) propagate.
+    """
+    out: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+    try:
+        vjson = call_model(
+            args, rt, VERIFY_BATCH_SYSTEM_PROMPT, verify_batch_prompt(batch, vmeta), args.verify_timeout_sec, metrics, "verify"
+        )
+    except ValueError:
+        if metrics is not None:
+            metrics.error("verify")
+        return out
+    results = vjson.get("results")
+    if not isinstance(results, list):
+        return out
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+        try:
+            i = int(item.get("index"))
+        except (TypeError, ValueError):
+            continue
+        decision = str(item.get("decision") or "").strip().lower()
+        if 0 <= i < len(batch) and out[i] is None and decision in {"pass", "need_evidence", "reject"}:
+            out[i] = item
+    return out
+
+
+def normalize_verdict(vjson: Dict[str, Any]) -> Dict[str, str]:
+    decision = str(vjson.get("decision") or "").strip().lower()
+    vreason = str(vjson.get("reason") or "").strip()
+    if decision not in {"pass", "need_evidence", "reject"}:
+        decision = "need_evidence"
+        vreason = (vreason + " | invalid verifier decision").strip(" |")
+    return {"decision": decision, "reason": vreason}
+
+
+def verify_candidates(
+    args: argparse.Namespace,
+    rt: Runtime,
+    c: Chunk,
+    principles: List[L0Candidate],
+    metrics: Optional[ChunkMetrics] = None,
+) -> List[Dict[str, str]]:
+    """Verify a chunk's candidates per --verifier-mode.
+
+    With --verify-batch-size > 1, every candidate that needs the model is sent in batched
+    requests; only entries whose batched result is missing or malformed are re-checked
+    one by one. A failed batch request is not retried per item: qwen mode raises, auto mode
+    keeps the rule verdicts of that batch. In auto mode a failed model check keeps the rule verdict.
+    """
+    verdicts: List[Dict[str, Any]] = [rule_verify_candidate(pp) if args.verifier_mode != "qwen" else {} for pp in principles]
+    if args.verifier_mode == "rules":
+        return [normalize_verdict(v) for v in verdicts]
+    strict = args.verifier_mode == "qwen"
+    todo = [i for i, v in enumerate(verdicts) if strict or v.get("decision") == "need_evidence"]
+    vmeta = {
+        "book_title": args.book_title,
+        "chapter_id": c.chapter_id,
+        "section_id": c.section_id,
+        "page_range": f"line:{c.line_start}-{c.line_end}",
+    }
+    size = max(1, args.verify_batch_size)
+    if size > 1 and len(todo) > 1:
+        retry: List[int] = []
+        for b in range(0, len(todo), size):
+            window = todo[b : b + size]
+            try:
+                results = verify_batch_with_qwen(args, rt, [principles[i].raw for i in window], vmeta, metrics)
+            except Exception:
+                if metrics is not None:
+                    metrics.error("verify")
+                if strict:
+                    raise
+                continue
+            for i, res in zip(window, results):
+                if res is None:
+                    retry.append(i)
+                else:
+                    verdicts[i] = res
+        todo = retry
+    for i in todo:
+        try:
+            verdicts[i] = verify_with_qwen(args, rt, principles[i].raw, vmeta, metrics)
+        except Exception:
+            if metrics is not None:
+                metrics.error("verify")
+            if strict:
+                raise
+    return [normalize_verdict(v) for v in verdicts]
+
+
+def extract_chunk(args: argparse.Namespace, rt: Runtime, c: Chunk) -> ChunkOutcome:
+    """Model-side work for one chunk (extraction + verification). Safe to run in a worker thread."""
+    m = ChunkMetrics(c.chunk_id, yield_score(c.text))
+    t0 = time.perf_counter()
+    meta = {
+        "book_id": args.book_id,
+        "book_title": args.book_title,
+        "author": args.author,
+        "chapter_id": c.chapter_id,
+        "section_id": c.section_id,
+        "page_range": f"line:{c.line_start}-{c.line_end}",
+    }
+    up = user_prompt(meta, c.text)
+    m.add_time("prompt", time.perf_counter() - t0)
+    raws: List[Dict[str, Any]] = []
+    candidates: List[Dict[str, Any]] = []
+    parsed_ok = False
+    try:
+        t0 = time.perf_counter()
+        try:
+            parsed = call_model(args, rt, SYSTEM_PROMPT, up, args.timeout_sec, m, "extract")
+        except Exception as e:
+            m.error("extract")
+            raise RuntimeError(f"qwen_failed: {e}") from e
+        finally:
+            m.add_time("extract", time.perf_counter() - t0)
+        parsed_ok = True
+        parsed["non_l0_content"] = parse_non_l0(parsed)
+        raws.append(
+            {
+                "chunk_id": c.chunk_id,
+                "line_start": c.line_start,
+                "line_end": c.line_end,
+                "response": parsed,
+            }
+        )
+
+        principles = parse_principles(parsed)
+        todo: List[Tuple[int, L0Candidate]] = []
+        dups: Dict[int, Tuple[str, float]] = {}
+        for pi, pp in principles:
+            match = rt.dedup.match(dedup_text(pp))
+            if match is not None:
+                dups[pi] = match
+            else:
+                todo.append((pi, pp))
+        t0 = time.perf_counter()
+        try:
+            verdicts = dict(zip((pi for pi, _ in todo), verify_candidates(args, rt, c, [pp for _, pp in todo], m)))
+        finally:
+            m.add_time("verify", time.perf_counter() - t0)
+        for pi, pp in todo:
+            if verdicts[pi]["decision"] in ACCEPTED_DECISIONS:
+                match = rt.dedup.add_or_match(dedup_text(pp), candidate_ref(args.book_id, c.chunk_id, pi))
+                if match is not None:
+                    dups[pi] = match
+        t0 = time.perf_counter()
+        for pi, pp in principles:
+            cand: Dict[str, Any] = {"chunk_id": c.chunk_id, "idx": pi}
+            if pi in dups:
+                ref, sim = dups[pi]
+                cand["verifier"] = {"decision": "duplicate", "reason": f"near-duplicate of {ref} (jaccard={sim:.2f})"}
+                cand["duplicate_of"] = ref
+            else:
+                cand["verifier"] = verdicts[pi]
+            cand["draft"] = build_l0_draft(args.book_title, c, pp, args.proposer)
+            candidates.append(cand)
+        m.add_time("draft", time.perf_counter() - t0)
+    except Exception as e:
+        raws.append({"chunk_id": c.chunk_id, "line_start": c.line_start, "line_end": c.line_end, "error": str(e)})
+        return ChunkOutcome(chunk=c, raws=raws, candidates=candidates, ok=parsed_ok, error=str(e), metrics=m)
+    return ChunkOutcome(chunk=c, raws=raws, candidates=candidates, ok=parsed_ok, metrics=m)
+
+
+def iter_outcomes(args: argparse.Namespace, work: Iterable[Tuple[BookRun, Chunk]]) -> Iterator[Tuple[BookRun, ChunkOutcome]]:
+    """Yield (book, outcome) in input order, extracting up to --workers chunks concurrently.
+
+    `work` is consumed lazily. Chunks present in their book's `resumed` (which may be filled
+    while `work` is iterated) are yielded from the checkpoint without touching the model.
+    """
+    workers = max(1, args.workers)
+    if workers == 1:
+        for book, c in work:
+            outcome = book.resumed.pop(c.chunk_id, None) or extract_chunk(book.args, book.rt, c)
+            book.charge(outcome)
+            yield book, outcome
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Tuple[BookRun, Future[ChunkOutcome]]] = deque()
+
+        def schedule(book: BookRun, c: Chunk) -> None:
+            fut: Future[ChunkOutcome]
+            if c.chunk_id in book.resumed:
+                fut = Future()
+                fut.set_result(book.resumed.pop(c.chunk_id))
+            else:
+                fut = pool.submit(extract_chunk, book.args, book.rt, c)
+            pending.append((book, fut))
+
+        it = iter(work)
+        for book, c in it:
+            schedule(book, c)
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            book, fut = pending.popleft()
+            outcome = fut.result()
+            book.charge(outcome)  # settle its tokens before the --budget check for the next chunk
+            nxt = next(it, None)
+            if nxt is not None:
+                schedule(*nxt)
+            yield book, outcome
+
+
+def interleave(streams: List[Tuple[BookRun, Iterable[Chunk]]]) -> Iterator[Tuple[BookRun, Chunk]]:
+    """Round-robin chunks across books so one long book cannot starve the others."""
+    active = [(book, iter(chunks)) for book, chunks in streams]
+    while active:
+        still = []
+        for book, it in active:
+            c = next(it, None)
+            if c is not None:
+                yield book, c
+                still.append((book, it))
+        active = still
+
+
+def submit_outcomes(
+    args: argparse.Namespace, rt: Runtime, writer: Optional[SqliteDraftWriter], outcomes: List[ChunkOutcome]
+) -> List[List[Dict[str, Any]]]:
+    """Submit non-rejected drafts of several chunks; sqlite mode writes them all in one transaction."""
+    results: List[List[Optional[Tuple[bool, str]]]] = []
+    queued: List[Tuple[int, int]] = []
+    items: List[Tuple[Dict[str, Any], str]] = []
+    for oi, outcome in enumerate(outcomes):
+        row: List[Optional[Tuple[bool, str]]] = []
+        for ci, cand in enumerate(outcome.candidates):
+            decision = cand["verifier"]["decision"]
+            draft = cand["draft"]
+            if decision == "reject":
+                row.append((False, f"verifier_reject: {cand['verifier']['reason']}"))
+            elif decision == "duplicate":
+                row.append((False, f"duplicate_of {cand['duplicate_of']}"))
+            elif writer is not None:
+                row.append(None)
+                queued.append((oi, ci))
+                items.append((draft, "DRAFT" if decision == "pass" else "NEED_EVIDENCE"))
+            else:
+                row.append(post_local_draft(args.submit_url, draft, client=rt.http))
+        results.append(row)
+    if writer is not None:
+        for (oi, ci), res in zip(queued, writer.write_batch(items)):
+            results[oi][ci] = res
+
+    submits: List[List[Dict[str, Any]]] = []
+    for outcome, row in zip(outcomes, results):
+        recs = []
+        for cand, res in zip(outcome.candidates, row):
+            ok, detail = res or (False, "not submitted")
+            recs.append(
+                {
+                    "chunk_id": cand["chunk_id"],
+                    "idx": cand["idx"],
+                    "ok": ok,
+                    "detail": detail,
+                    "principle_key": cand["draft"].get("principle_key"),
+                }
+            )
+        submits.append(recs)
+    return submits
+
+
+def submit_failed(rec: Dict[str, Any]) -> bool:
+    """True for a draft that should have been stored but was not (verifier rejects and duplicates are not failures)."""
+    return not rec.get("ok") and not str(rec.get("detail") or "").startswith(("verifier_reject", "duplicate_of"))
+
+
+def parse_l0_id(detail: str) -> Optional[int]:
+    m = re.search(r"l0_id=(\d+)", detail or "")
+    return int(m.group(1)) if m else None
+
+
+def merge_duplicate_citations(
+    book_id: str,
+    rt: Runtime,
+    writer: Optional[SqliteDraftWriter],
+    outcomes: List[ChunkOutcome],
+    submits: List[List[Dict[str, Any]]],
+) -> None:
+    """Attach citations of near-duplicate candidates to their canonical l0_principles row.
+
+    A duplicate may be seen before its canonical is inserted (workers finish out of order);
+    its citations are then parked until the canonical's insert is known; the canonical may
+    belong to another book. Only sqlite mode can attach citations.
+    """
+    dd = rt.dedup
+    for outcome, recs in zip(outcomes, submits):
+        for cand, rec in zip(outcome.candidates, recs):
+            l0_id = parse_l0_id(rec["detail"]) if rec["ok"] else None
+            if "duplicate_of" not in cand and l0_id is not None:
+                dd.l0_ids[candidate_ref(book_id, cand["chunk_id"], cand["idx"])] = l0_id
+    attach: List[Tuple[int, Dict[str, Any]]] = []
+    for outcome, recs in zip(outcomes, submits):
+        for cand, rec in zip(outcome.candidates, recs):
+            ref = cand.get("duplicate_of")
+            if ref is None:
+                continue
+            cites = cand["draft"].get("citations") or []
+            if ref in dd.l0_ids:
+                attach.extend((dd.l0_ids[ref], c) for c in cites)
+                rec["detail"] += f" merged_into l0_id={dd.l0_ids[ref]}"
+            else:
+                dd.parked.setdefault(ref, []).extend(cites)
+    for ref in [r for r in dd.parked if r in dd.l0_ids]:
+        attach.extend((dd.l0_ids[ref], c) for c in dd.parked.pop(ref))
+    if writer is not None and attach:
+        if writer.write_citations(attach):
+            dd.citations_attached += len(attach)
+
+
+def write_jsonl(f: TextIO, record: Dict[str, Any]) -> None:
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_chunk_manifest(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return []
+    chunks = data.get("chunks") if isinstance(data, dict) else None
+    return [e for e in chunks or [] if isinstance(e, dict) and e.get("key") and e.get("sha256")]
+
+
+class BookRun:
+    """Per-book state of a run: book args, output files, checkpoint and chunks awaiting submit.
+
+    Books share the Runtime services, the sqlite writer and the dedup index, so a principle
+    repeated in another book is merged into the first book's draft (refs are
+    "book_id:chunk_id#idx"). Every run records a chunk
+    manifest (line range, content hash, checkpoint key and inserted l0_ids per chunk); an
+    --incremental run diffs against the previous one to supersede drafts of edited chunks.
+    """
+
+    def __init__(self, args: argparse.Namespace, rt: Runtime, out_dir: Path) -> None:
+        self.args = args
+        self.book_id = args.book_id
+        self.rt = rt
+        self.out_dir = out_dir
+        self.raw_out = out_dir / "raw_results.jsonl"
+        self.cand_out = out_dir / "l0_candidates.jsonl"
+        self.submit_out = out_dir / "submit_results.jsonl"
+        self.checkpoint_path = out_dir / "checkpoint.jsonl"
+        self.metrics_out = out_dir / "chunk_metrics.jsonl"
+        self.manifest_path = out_dir / "chunk_manifest.json"
+        self.previous = load_chunk_manifest(self.manifest_path) if args.incremental else []
+        self.entries: List[Dict[str, Any]] = []
+        self.present: Set[str] = set()  # content hashes of every chunk the chunker produced, extracted or not
+        self.scanned_all = False
+        self.incremental: Optional[Dict[str, Any]] = None
+        self.budget: Optional[Dict[str, Any]] = None
+        self.tokens_spent = 0  # `usage` prompt + completion tokens of this run's model calls
+        self.reserved: Dict[str, float] = {}  # --budget prompt estimates of chunks in flight
+        self.settled_est = 0.0
+        self.settled_actual = 0
+        self.keys: Dict[str, str] = {}
+        self.resumed: Dict[str, ChunkOutcome] = {}
+        self.chunking_sec: Dict[str, float] = {}
+        self.done = load_checkpoint(self.checkpoint_path) if args.resume else {}
+        self.pending: List[ChunkOutcome] = []
+        self.request_tokens: List[float] = []
+        self.chunks_total = 0
+        self.resumed_count = 0
+        self.success_calls = 0
+        self.submit_ok = 0
+        self.retried_submits = 0
+        self.duplicates = 0  # candidates merged into a canonical (run-wide stats: Runtime.dedup)
+        # Carried-over records were read into `done` above, so truncating the outputs here is safe.
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.fr = self.raw_out.open("w", encoding="utf-8")
+        self.fc = self.cand_out.open("w", encoding="utf-8")
+        self.fs = self.submit_out.open("w", encoding="utf-8")
+        self.fk = self.checkpoint_path.open("a" if self.args.resume else "w", encoding="utf-8")
+        self.fm = self.metrics_out.open("w", encoding="utf-8")
+
+    def close(self) -> None:
+        for f in (self.fr, self.fc, self.fs, self.fk, self.fm):
+            f.close()
+
+    def keyed(self, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+        """Pass chunks through, timing their production and loading checkpointed ones into `resumed`.
+
+        Chunks are streamed from disk, so checkpoint lookups happen as each one is read.
+        """
+        it = iter(chunks)
+        while True:
+            t0 = time.perf_counter()
+            c = next(it, None)
+            if c is None:
+                return
+            self.chunking_sec[c.chunk_id] = self.chunking_sec.get(c.chunk_id, 0.0) + time.perf_counter() - t0
+            self.keys[c.chunk_id] = chunk_checkpoint_key(c, self.args.model, self.args.verifier_mode)
+            self.present.add(chunk_sha256(c))
+            rec = self.done.get(self.keys[c.chunk_id])
+            if rec is not None:
+                carried = outcome_from_checkpoint(c, rec)
+                self.resumed[c.chunk_id] = carried
+                resp = next((r["response"] for r in carried.raws if isinstance(r.get("response"), dict)), {})
+                principles = dict(parse_principles(resp))
+                for cand, sub in zip(carried.candidates, carried.submits or []):
+                    pp = principles.get(cand["idx"])
+                    if "duplicate_of" in cand or pp is None or cand["verifier"]["decision"] not in ACCEPTED_DECISIONS:
+                        continue
+                    ref = candidate_ref(self.book_id, c.chunk_id, cand["idx"])
+                    self.rt.dedup.add_or_match(dedup_text(pp), ref)
+                    l0_id = parse_l0_id(sub.get("detail", "")) if sub.get("ok") else None
+                    if l0_id is not None:
+                        self.rt.dedup.l0_ids[ref] = l0_id
+            yield c
+
+    def prioritize(self, open_stream: Callable[[], Iterable[Chunk]], budget: float, cost: Callable[[Chunk], float]) -> Iterator[Chunk]:
+        """--budget: feed the book's chunks by descending yield_score until `usage` tokens run out.
+
+        Scoring keeps only (score, position, key, estimated prompt cost) per chunk. Chunks are then
+        re-read from fresh streams, RERANK_WINDOW ranks per pass, and handed out best first. A chunk
+        is scheduled while the tokens models actually reported (prompt + completion, extraction and
+        verification, settled by charge()) plus the estimates of chunks still in flight leave room
+        for its own estimate; estimates are scaled by the actual/estimated ratio seen so far. Once a
+        chunk does not fit nothing new is scheduled, but checkpointed chunks cost nothing and are
+        always kept. Chunks already in flight (up to 2 x --workers, sized before any usage was
+        known) still finish, which bounds the overshoot. --max-chunks caps the number of chunks
+        sent to the model.
+        """
+        scored: List[Tuple[float, int, str, float]] = []
+        t0 = time.perf_counter()
+        for i, c in enumerate(open_stream()):
+            key = chunk_checkpoint_key(c, self.args.model, self.args.verifier_mode)
+            scored.append((yield_score(c.text), i, key, 0.0 if key in self.done else cost(c)))
+            self.present.add(chunk_sha256(c))
+        self.scanned_all = True
+        per_chunk = (time.perf_counter() - t0) / max(1, len(scored))
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        self.budget = {
+            "budget_tokens": budget,
+            "spent_tokens": 0,
+            "chunks_available": len(scored),
+            "chunks_selected": 0,
+            "min_selected_score": None,
+        }
+        stats = self.budget
+
+        def ranked() -> Iterator[Chunk]:
+            fresh = 0
+            exhausted = False
+            for r0 in range(0, len(scored), RERANK_WINDOW):
+                part = scored[r0 : r0 + RERANK_WINDOW]
+                if exhausted:
+                    part = [x for x in part if x[2] in self.done]
+                    if not part:
+                        continue
+                want = {i: key for _, i, key, _ in part}
+                found: Dict[int, Chunk] = {}
+                for i, c in enumerate(open_stream()):
+                    if want.get(i) == chunk_checkpoint_key(c, self.args.model, self.args.verifier_mode):
+                        found[i] = c
+                for score, i, key, est in part:
+                    c = found.pop(i, None)
+                    if c is None:
+                        continue  # the input changed since scoring
+                    if key not in self.done:
+                        if (
+                            exhausted
+                            or (self.args.max_chunks > 0 and fresh >= self.args.max_chunks)
+                            or self.tokens_spent + (sum(self.reserved.values()) + est) * self.token_ratio() > budget
+                        ):
+                            exhausted = True
+                            continue
+                        self.reserved[c.chunk_id] = est
+                        fresh += 1
+                    stats["chunks_selected"] += 1
+                    stats["min_selected_score"] = score  # ranks descend, so the latest is the minimum
+                    self.chunking_sec[c.chunk_id] = per_chunk
+                    yield c
+
+        return ranked()
+
+    def token_ratio(self) -> float:
+        """Actual `usage` tokens per estimated prompt token over settled chunks (1.0 until known)."""
+        return self.settled_actual / self.settled_est if self.settled_est > 0 and self.settled_actual > 0 else 1.0
+
+    def charge(self, outcome: ChunkOutcome) -> None:
+        """Count a finished chunk's `usage` tokens and release its --budget reservation."""
+        est = self.reserved.pop(outcome.chunk.chunk_id, None)
+        if outcome.metrics is None:
+            return
+        used = outcome.metrics.tokens()
+        self.tokens_spent += used
+        if est is not None and used > 0:
+            self.settled_est += est
+            self.settled_actual += used
+        if self.budget is not None:
+            self.budget["spent_tokens"] = self.tokens_spent
+
+    def record_chunk(self, outcome: ChunkOutcome) -> None:
+        c = outcome.chunk
+        l0_ids = []
+        for cand, rec in zip(outcome.candidates, outcome.submits or []):
+            l0_id = parse_l0_id(rec.get("detail", "")) if rec.get("ok") and "duplicate_of" not in cand else None
+            if l0_id is not None:
+                l0_ids.append(l0_id)
+        self.entries.append(
+            {
+                "chunk_id": c.chunk_id,
+                "chapter_id": c.chapter_id,
+                "line_start": c.line_start,
+                "line_end": c.line_end,
+                "sha256": chunk_sha256(c),
+                "key": self.keys[c.chunk_id],
+                "l0_ids": l0_ids,
+                "complete": outcome.ok and not outcome.error,
+            }
+        )
+
+    def finish(self, writer: Optional[SqliteDraftWriter]) -> None:
+        """Write the chunk manifest; in --incremental runs first supersede drafts of chunks that are gone.
+
+        A previous chunk whose content (sha256) the chunker no longer produces was edited (or
+        re-chunked); a model or prompt change alone alters the checkpoint key but not the content,
+        so it only triggers re-extraction. A chunk is only judged when this run covered its chapter
+        and, if --max-chunks cut the run short, its line range. Other previous chunks (including
+        ones --budget skipped) are carried over untouched.
+        """
+        produced = {e["sha256"] for e in self.entries}
+        chapters = {e["chapter_id"] for e in self.entries}
+        truncated = not self.scanned_all and self.args.max_chunks > 0 and self.chunks_total >= self.args.max_chunks
+        last_line = max((e["line_end"] for e in self.entries), default=0)
+        stale: List[Dict[str, Any]] = []
+        carried: List[Dict[str, Any]] = []
+        for e in self.previous:
+            sha = e.get("sha256")
+            if sha in produced:
+                continue
+            if (
+                sha not in self.present
+                and e.get("chapter_id") in chapters
+                and (not truncated or int(e.get("line_start") or 0) <= last_line)
+            ):
+                stale.append(e)
+            else:
+                carried.append(e)
+        if self.args.incremental:
+            rejected: List[int] = []
+            kept: List[int] = []
+            for e in stale:
+                ids = [int(i) for i in e.get("l0_ids") or []]
+                if writer is None:
+                    kept.extend(ids)
+                    continue
+                note = f"superseded: source chunk {e['chunk_id']} (line:{e['line_start']}-{e['line_end']}) changed in {self.args.input}"
+                r, k = writer.supersede(ids, self.args.proposer, note)
+                rejected.extend(r)
+                kept.extend(k)
+            self.incremental = {
+                "previous_chunks": len(self.previous),
+                "unchanged_chunks": self.resumed_count,
+                "reextracted_chunks": self.chunks_total - self.resumed_count,
+                "superseded_chunks": len(stale),
+                "superseded_l0_ids": rejected,
+                "needs_review_l0_ids": kept,
+            }
+        manifest = {
+            "book_id": self.book_id,
+            "input": self.args.input,
+            "chunker": self.args.chunker,
+            "model": self.args.model,
+            "prompt_version": PROMPT_VERSION,
+            "chunks": sorted(self.entries + carried, key=lambda e: (str(e.get("chapter_id")), int(e.get("line_start") or 0))),
+        }
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def summary(self) -> Dict[str, Any]:
+        out = {
+            "book_id": self.book_id,
+            "chunks_total": self.chunks_total,
+            "resumed_chunks": self.resumed_count,
+            "api_success_chunks": self.success_calls,
+            "submitted_drafts_ok": self.submit_ok,
+            "retried_submits": self.retried_submits,
+            "duplicate_candidates": self.duplicates,
+            "out_dir": str(self.out_dir),
+        }
+        if self.incremental is not None:
+            out["incremental"] = self.incremental
+        if self.budget is not None:
+            out["budget"] = self.budget
+        return out
+
+
+def flush_submits(book: BookRun, writer: Optional[SqliteDraftWriter]) -> None:
+    """Submit the book's pending chunks, write their submit and metrics records, then checkpoint the completed ones.
+
+    Submit time of the shared transaction is split across chunks by candidate count.
+    """
+    pending, book.pending = book.pending, []
+    if not pending:
+        return
+    rt = book.rt
+    t0 = time.perf_counter()
+    results = submit_outcomes(book.args, rt, writer, pending)
+    merge_duplicate_citations(book.book_id, rt, writer, pending, results)
+    submit_sec = time.perf_counter() - t0
+    total_cands = sum(len(o.candidates) for o in pending)
+    for outcome, submits in zip(pending, results):
+        for rec in submits:
+            write_jsonl(book.fs, rec)
+            if rec["ok"]:
+                book.submit_ok += 1
+        outcome.submits = submits
+        book.record_chunk(outcome)
+        m = outcome.metrics
+        if m is None:
+            continue
+        m.add_time("chunking", book.chunking_sec.pop(outcome.chunk.chunk_id, 0.0))
+        share = len(outcome.candidates) / total_cands if total_cands else 1 / len(pending)
+        m.add_time("submit", submit_sec * share)
+        m.error("submit", sum(1 for rec in submits if submit_failed(rec)))
+        m.candidates = len(outcome.candidates)
+        m.accepted = sum(1 for cand in outcome.candidates if cand["verifier"]["decision"] in ACCEPTED_DECISIONS)
+        write_jsonl(book.fm, m.record(len(outcome.chunk.text)))
+        rt.metrics.add(m)
+    for f in (book.fr, book.fc, book.fs, book.fm):
+        f.flush()
+    for outcome in pending:
+        if outcome.ok and not outcome.error:
+            write_checkpoint(book, outcome)
+    book.fk.flush()
+
+
+def write_checkpoint(book: BookRun, outcome: ChunkOutcome) -> None:
+    """Checkpoint a finished chunk; failed submits are kept as such and retried on --resume."""
+    write_jsonl(
+        book.fk,
+        {
+            "key": book.keys[outcome.chunk.chunk_id],
+            "chunk_id": outcome.chunk.chunk_id,
+            "raws": outcome.raws,
+            "candidates": outcome.candidates,
+            "submits": outcome.submits,
+        },
+    )
+
+
+def retry_failed_submits(book: BookRun, writer: Optional[SqliteDraftWriter], outcome: ChunkOutcome) -> None:
+    """Re-submit the drafts of a checkpointed chunk whose submit failed last run (locked DB, endpoint down).
+
+    The refreshed submit records replace the old ones in place and the chunk is checkpointed again
+    (the last record per key wins), so a draft is retried until it is stored.
+    """
+    failed = [i for i, rec in enumerate(outcome.submits or []) if submit_failed(rec)]
+    if not failed:
+        return
+    part = ChunkOutcome(chunk=outcome.chunk, raws=[], candidates=[outcome.candidates[i] for i in failed], ok=True)
+    results = submit_outcomes(book.args, book.rt, writer, [part])
+    merge_duplicate_citations(book.book_id, book.rt, writer, [part], results)
+    assert outcome.submits is not None
+    for i, rec in zip(failed, results[0]):
+        outcome.submits[i] = rec
+    book.retried_submits += len(failed)
+    write_checkpoint(book, outcome)
+    book.fk.flush()
+
+
+def handle_outcome(book: BookRun, writer: Optional[SqliteDraftWriter], outcome: ChunkOutcome) -> None:
+    """Main-thread bookkeeping for one finished chunk: JSONL records, then submit in --db-batch groups."""
+    c = outcome.chunk
+    carried = outcome.submits is not None
+    book.chunks_total += 1
+    book.resumed_count += int(carried)
+    for raw in outcome.raws:
+        write_jsonl(book.fr, raw)
+    for cand in outcome.candidates:
+        write_jsonl(book.fc, cand)
+        book.duplicates += int("duplicate_of" in cand)
+    if outcome.ok:
+        book.success_calls += 1
+    if carried:
+        book.chunking_sec.pop(c.chunk_id, None)
+        flush_submits(book, writer)
+        retry_failed_submits(book, writer, outcome)
+        for rec in outcome.submits or []:
+            write_jsonl(book.fs, rec)
+            if rec.get("ok"):
+                book.submit_ok += 1
+        book.record_chunk(outcome)
+        return
+    book.pending.append(outcome)
+    if sum(len(o.candidates) for o in book.pending) >= max(1, book.args.db_batch):
+        flush_submits(book, writer)
+
+
+def open_chunks(args: argparse.Namespace, estimate: Callable[[str], int]) -> Iterable[Chunk]:
+    """Lazy chunk stream for args.input per --chunker; raises ValueError on bad --ranges."""
+    src = Path(args.input)
+    chunks: Iterable[Chunk]
+    if args.chunker == "ranges":
+        chunks = iter_chunks_from_file(
+            src, parse_ranges(args.ranges), target_chars=args.target_chars, target_tokens=args.target_tokens, estimator=estimate
+        )
+    else:
+        chunks = iter_structured_chunks(
+            src,
+            target_chars=args.target_tokens if args.target_tokens > 0 else args.target_chars,
+            overlap_paragraphs=args.overlap_paragraphs,
+            measure=estimate if args.target_tokens > 0 else len,
+            chapters=[x.strip() for x in args.chapters.split(",") if x.strip()] or None,
+        )
+    if args.max_chunks > 0 and args.budget <= 0:
+        chunks = itertools.islice(chunks, args.max_chunks)  # with --budget the cap applies after ranking
+    return chunks
+
+
+def load_manifest(path: Path, args: argparse.Namespace) -> List[argparse.Namespace]:
+    """Per-book copies of `args` from a manifest.
+
+    The manifest is a JSON list (or {"books": [...]}) or JSONL of objects with id, title,
+    author, path and optional ranges ("ch01:10-200,..." or a list) and chapters. Books with
+    ranges use the ranges chunker, others the headings chunker (the default --ranges only fit
+    the McGee edition). Relative paths resolve against the manifest's directory. Raises
+    ValueError on a bad manifest.
+    """
+    text = path.read_text(encoding="utf-8")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        data = data.get("books")
+    if not isinstance(data, list) or not data:
+        raise ValueError("manifest must list at least one book")
+    books: List[argparse.Namespace] = []
+    seen: Set[str] = set()
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict) or not entry.get("id") or not entry.get("path"):
+            raise ValueError(f"book #{i}: id and path are required")
+        book_id = str(entry["id"])
+        if book_id in seen or not re.fullmatch(r"[A-Za-z0-9_.-]+", book_id):
+            raise ValueError(f"book #{i}: id {book_id!r} is duplicated or not usable as a directory name")
+        seen.add(book_id)
+        bargs = argparse.Namespace(**vars(args))
+        bargs.book_id = book_id
+        bargs.book_title = str(entry.get("title") or book_id)
+        bargs.author = str(entry.get("author") or "")
+        bargs.input = str((path.parent / str(entry["path"])).resolve())
+        ranges = entry.get("ranges")
+        bargs.chunker = "ranges" if ranges else "headings"
+        if ranges:
+            bargs.ranges = ",".join(ranges) if isinstance(ranges, list) else str(ranges)
+            parse_ranges(bargs.ranges)
+        if entry.get("chapters"):
+            ch = entry["chapters"]
+            bargs.chapters = ",".join(ch) if isinstance(ch, list) else str(ch)
+        books.append(bargs)
+    return books
+
+
 def main() -> int:
     p = argparse.ArgumentParser()
-    p.add_argument("--input", required=True, help="book markdown path")
+    p.add_argument("--input", default="", help="book markdown path (single-book mode)")
+    p.add_argument(
+        "--manifest",
+        default="",
+        help="JSON/JSONL list of books {id,title,author,path,ranges?,chapters?}; outputs go to out-dir/<id>/",
+    )
     p.add_argument("--book-id", default="mcgee_on_food_and_cooking")
     p.add_argument("--book-title", default="On Food and Cooking")
     p.add_argument("--author", default="Harold McGee")
@@ -398,212 +2545,207 @@ def main() -> int:
     p.add_argument("--api-key", default=os.getenv("CODING_PLAN_KEY", ""))
     p.add_argument("--max-chunks", type=int, default=24)
     p.add_argument("--target-chars", type=int, default=1800)
-    p.add_argument("--sleep-sec", type=float, default=0.25)
+    p.add_argument(
+        "--chunker",
+        choices=["headings", "ranges"],
+        default="ranges",
+        help="ranges: fixed --ranges line spans (default, chunk ids of earlier runs); headings: markdown chapters/sections",
+    )
+    p.add_argument(
+        "--ranges",
+        default="ch01:163-1606,ch02:1607-2540,ch03:2541-3707",
+        help="chapter line ranges for --chunker ranges, e.g. ch01:163-1606,ch02:1607-2540",
+    )
+    p.add_argument("--chapters", default="", help="comma-separated chapter ids to keep (headings chunker), e.g. ch01,ch02")
+    p.add_argument("--overlap-paragraphs", type=int, default=1, help="paragraphs repeated between adjacent chunks (headings chunker)")
+    p.add_argument("--target-tokens", type=int, default=0, help="chunk budget in estimated tokens (overrides --target-chars)")
+    p.add_argument("--token-estimator", choices=sorted(TOKEN_ESTIMATORS), default="heuristic")
+    p.add_argument(
+        "--budget",
+        type=float,
+        default=0,
+        help="model tokens per book (reported usage: prompt + completion, extraction and verification); chunks run in descending predicted yield until spent (0=off)",
+    )
+    p.add_argument("--sleep-sec", type=float, default=0.25, help="legacy pacing; used as 1/rps when --rps is not set")
+    p.add_argument("--workers", type=int, default=1, help="concurrent chunk extractions")
+    p.add_argument("--rps", type=float, default=None, help="shared model requests/sec limit across workers (0=unlimited)")
     p.add_argument("--timeout-sec", type=int, default=120)
-    p.add_argument("--retry", type=int, default=2)
+    p.add_argument("--retry", type=int, default=2, help="extra attempts on network errors, 429 and 5xx")
+    p.add_argument("--backoff-base-sec", type=float, default=1.0)
+    p.add_argument("--backoff-max-sec", type=float, default=30.0)
+    p.add_argument("--breaker-threshold", type=int, default=5, help="consecutive failures that pause all workers (0=off)")
+    p.add_argument("--breaker-cooldown-sec", type=float, default=30.0)
     p.add_argument("--verify-timeout-sec", type=int, default=35)
     p.add_argument("--verifier-mode", choices=["auto", "qwen", "rules"], default="auto")
+    p.add_argument("--dedup-threshold", type=float, default=0.8, help="shingle Jaccard for near-duplicate candidates (0=off)")
+    p.add_argument("--verify-batch-size", type=int, default=10, help="candidates per verifier call (1=one call each)")
     p.add_argument("--submit-mode", choices=["http", "sqlite"], default="sqlite")
     p.add_argument("--sqlite-db", default="/Users/jeff/Documents/New project/data/l0_engine.db")
+    p.add_argument("--db-batch", type=int, default=50, help="drafts per sqlite transaction")
+    p.add_argument("--db-busy-timeout-ms", type=int, default=10000)
     p.add_argument("--out-dir", default="/Users/jeff/Documents/New project/output/l0_extract_batch1")
     p.add_argument("--submit-url", default="http://localhost:3000/api/l0/changes")
     p.add_argument("--proposer", default="qwen_batch1")
+    p.add_argument("--gzip-requests", action="store_true", help="gzip request bodies (endpoint must accept Content-Encoding: gzip)")
+    p.add_argument("--resume", action="store_true", help="skip chunks already completed in out-dir/checkpoint.jsonl")
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="after editing a book: re-extract only changed chunks (implies --resume) and reject drafts of replaced chunks",
+    )
+    p.add_argument(
+        "--cache-mode",
+        choices=["read", "write", "off"],
+        default="write",
+        help="LLM response cache: write=read+store, read=read only, off=bypass",
+    )
+    p.add_argument("--cache-path", default="", help="response cache sqlite (default: out-dir/llm_cache.sqlite)")
+    p.add_argument("--cache-ttl-days", type=float, default=30.0)
+    p.add_argument("--cache-max-mb", type=float, default=512.0)
+    p.add_argument("--price-prompt-per-1k", type=float, default=0.0, help="prompt token price for the cost report (0=omit)")
+    p.add_argument("--price-completion-per-1k", type=float, default=0.0, help="completion token price for the cost report")
     args = p.parse_args()
 
     if not args.api_key:
         print("fatal: missing --api-key or CODING_PLAN_KEY", file=sys.stderr)
         return 2
-
-    src = Path(args.input)
-    if not src.exists():
-        print(f"fatal: input not found: {src}", file=sys.stderr)
+    if bool(args.input) == bool(args.manifest):
+        print("fatal: pass exactly one of --input or --manifest", file=sys.stderr)
         return 2
+    if args.incremental:
+        args.resume = True
+
+    if args.manifest:
+        try:
+            book_args = load_manifest(Path(args.manifest), args)
+        except (OSError, ValueError) as e:
+            print(f"fatal: bad --manifest: {e}", file=sys.stderr)
+            return 2
+    else:
+        book_args = [args]
+    for bargs in book_args:
+        if not Path(bargs.input).exists():
+            print(f"fatal: input not found: {bargs.input}", file=sys.stderr)
+            return 2
 
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
-    raw_out = out_dir / "raw_results.jsonl"
-    cand_out = out_dir / "l0_candidates.jsonl"
-    submit_out = out_dir / "submit_results.jsonl"
-
-    lines = read_lines(src)
-    ranges = [("ch01", 163, 1606), ("ch02", 1607, 2540), ("ch03", 2541, 3707)]
-    chunks = chunk_lines(lines, ranges, target_chars=args.target_chars)
-    if args.max_chunks > 0:
-        chunks = chunks[: args.max_chunks]
-
-    print(f"chunks_prepared={len(chunks)}")
-    success_calls = 0
-    submit_ok = 0
-
-    with raw_out.open("w", encoding="utf-8") as fr, cand_out.open("w", encoding="utf-8") as fc, submit_out.open(
-        "w", encoding="utf-8"
-    ) as fs:
-        for idx, c in enumerate(chunks, start=1):
-            meta = {
-                "book_id": args.book_id,
-                "book_title": args.book_title,
-                "author": args.author,
-                "chapter_id": c.chapter_id,
-                "section_id": c.section_id,
-                "page_range": f"line:{c.line_start}-{c.line_end}",
-            }
-            up = user_prompt(meta, c.text)
-            print(f"[{idx}/{len(chunks)}] {c.chunk_id}", flush=True)
-            try:
-                last_err = None
-                res = None
-                for _ in range(args.retry + 1):
-                    try:
-                        res = chat_qwen(
-                            args.base_url,
-                            args.api_key,
-                            args.model,
-                            SYSTEM_PROMPT,
-                            up,
-                            timeout_sec=args.timeout_sec,
-                        )
-                        break
-                    except Exception as e:
-                        last_err = e
-                        time.sleep(1.0)
-                if res is None:
-                    raise RuntimeError(f"qwen_failed: {last_err}")
-                msg = (((res.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
-                parsed = extract_json_block(msg)
-                success_calls += 1
-                fr.write(
-                    json.dumps(
-                        {
-                            "chunk_id": c.chunk_id,
-                            "line_start": c.line_start,
-                            "line_end": c.line_end,
-                            "response": parsed,
-                        },
-                        ensure_ascii=False,
-                    )
-                    + "\n"
-                )
+    metrics_report_out = out_dir / "metrics_report.json"
 
-                principles = parsed.get("principles") or []
-                if not isinstance(principles, list):
-                    principles = []
-                for pi, pp in enumerate(principles, start=1):
-                    if not isinstance(pp, dict):
-                        continue
-                    if args.verifier_mode == "rules":
-                        vjson = rule_verify_candidate(pp)
-                    else:
-                        vmeta = {
-                            "book_title": args.book_title,
-                            "chapter_id": c.chapter_id,
-                            "section_id": c.section_id,
-                            "page_range": f"line:{c.line_start}-{c.line_end}",
-                        }
-                        vjson = {}
-                        if args.verifier_mode == "qwen":
-                            vres = chat_qwen(
-                                args.base_url,
-                                args.api_key,
-                                args.model,
-                                VERIFY_SYSTEM_PROMPT,
-                                verify_prompt(pp, vmeta),
-                                timeout_sec=args.verify_timeout_sec,
-                            )
-                            vmsg = (((vres.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
-                            vjson = extract_json_block(vmsg)
-                        else:
-                            vjson = rule_verify_candidate(pp)
-                            if vjson.get("decision") == "need_evidence":
-                                try:
-                                    vres = chat_qwen(
-                                        args.base_url,
-                                        args.api_key,
-                                        args.model,
-                                        VERIFY_SYSTEM_PROMPT,
-                                        verify_prompt(pp, vmeta),
-                                        timeout_sec=args.verify_timeout_sec,
-                                    )
-                                    vmsg = (((vres.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
-                                    vjson = extract_json_block(vmsg)
-                                except Exception:
-                                    pass
-                    decision = str(vjson.get("decision") or "").strip().lower()
-                    vreason = str(vjson.get("reason") or "").strip()
-                    if decision not in {"pass", "need_evidence", "reject"}:
-                        decision = "need_evidence"
-                        vreason = (vreason + " | invalid verifier decision").strip(" |")
-
-                    draft = build_l0_draft(args.book_title, c, pp, args.proposer)
-                    fc.write(
-                        json.dumps(
-                            {
-                                "chunk_id": c.chunk_id,
-                                "idx": pi,
-                                "verifier": {"decision": decision, "reason": vreason},
-                                "draft": draft,
-                            },
-                            ensure_ascii=False,
-                        )
-                        + "\n"
-                    )
-                    if decision == "reject":
-                        fs.write(
-                            json.dumps(
-                                {
-                                    "chunk_id": c.chunk_id,
-                                    "idx": pi,
-                                    "ok": False,
-                                    "detail": f"verifier_reject: {vreason}",
-                                    "principle_key": draft.get("principle_key"),
-                                },
-                                ensure_ascii=False,
-                            )
-                            + "\n"
-                        )
-                        continue
-                    if args.submit_mode == "sqlite":
-                        status = "DRAFT" if decision == "pass" else "NEED_EVIDENCE"
-                        ok, detail = submit_draft_sqlite(args.sqlite_db, draft, status=status)
-                    else:
-                        ok, detail = post_local_draft(args.submit_url, draft)
-                    if ok:
-                        submit_ok += 1
-                    fs.write(
-                        json.dumps(
-                            {
-                                "chunk_id": c.chunk_id,
-                                "idx": pi,
-                                "ok": ok,
-                                "detail": detail,
-                                "principle_key": draft.get("principle_key"),
-                            },
-                            ensure_ascii=False,
-                        )
-                        + "\n"
-                    )
-            except Exception as e:
-                fr.write(
-                    json.dumps(
-                        {"chunk_id": c.chunk_id, "line_start": c.line_start, "line_end": c.line_end, "error": str(e)},
-                        ensure_ascii=False,
-                    )
-                    + "\n"
-                )
-            time.sleep(args.sleep_sec)
+    try:
+        estimate = get_token_estimator(args.token_estimator)
+    except ImportError as e:
+        print(f"fatal: token estimator {args.token_estimator} unavailable: {e}", file=sys.stderr)
+        return 2
+    # Fixed per-request cost: system prompt plus the user prompt template without chunk text.
+    prompt_overhead = estimate(SYSTEM_PROMPT) + estimate(user_prompt({}, ""))
 
-    print(
-        json.dumps(
-            {
-                "chunks_total": len(chunks),
-                "api_success_chunks": success_calls,
-                "submitted_drafts_ok": submit_ok,
-                "raw_out": str(raw_out),
-                "candidates_out": str(cand_out),
-                "submit_out": str(submit_out),
-            },
-            ensure_ascii=False,
-        )
+    streams: List[Tuple[Iterable[Chunk], argparse.Namespace]] = []
+    for bargs in book_args:
+        try:
+            streams.append((open_chunks(bargs, estimate), bargs))
+        except ValueError as e:
+            print(f"fatal: bad --ranges for {bargs.book_id}: {e}", file=sys.stderr)
+            return 2
+
+    if args.rps is None:
+        args.rps = 1.0 / args.sleep_sec if args.sleep_sec > 0 else 0.0
+    cache_path = Path(args.cache_path) if args.cache_path else out_dir / "llm_cache.sqlite"
+    rt = Runtime(
+        limiter=RateLimiter(args.rps),
+        cache=ResponseCache(
+            cache_path,
+            mode=args.cache_mode,
+            ttl_sec=args.cache_ttl_days * 86400,
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        ),
+        http=HttpClient(gzip_requests=args.gzip_requests),
+        retry=RetryPolicy(
+            max_attempts=args.retry + 1,
+            base_sec=args.backoff_base_sec,
+            max_sec=args.backoff_max_sec,
+            breaker=CircuitBreaker(args.breaker_threshold, args.breaker_cooldown_sec),
+        ),
+        dedup=DedupIndex(threshold=args.dedup_threshold),
+        metrics=RunMetrics(args.price_prompt_per_1k, args.price_completion_per_1k),
     )
+
+    books = [BookRun(bargs, rt, out_dir / bargs.book_id if args.manifest else out_dir) for _, bargs in streams]
+    if args.budget > 0:
+        def cost(c: Chunk) -> float:
+            return prompt_overhead + estimate(c.text)
+
+        streams = [
+            (book.prioritize(lambda bargs=bargs: open_chunks(bargs, estimate), args.budget, cost), bargs)
+            for book, (_, bargs) in zip(books, streams)
+        ]
+    writer = SqliteDraftWriter(args.sqlite_db, args.db_busy_timeout_ms) if args.submit_mode == "sqlite" else None
+
+    src = args.manifest or args.input
+    print(f"chunks_streaming from={src} books={len(books)} workers={max(1, args.workers)} rps={args.rps:g} resume={args.resume}")
+
+    # Model calls run in the pool, fed round-robin across books; JSONL writes and DB submits
+    # stay on this thread, in chunk order within each book.
+    work = interleave([(book, book.keyed(chunks)) for book, (chunks, _) in zip(books, streams)])
+    try:
+        for idx, (book, outcome) in enumerate(iter_outcomes(args, work), start=1):
+            c = outcome.chunk
+            carried = outcome.submits is not None
+            book.request_tokens.append(prompt_overhead + estimate(c.text))
+            handle_outcome(book, writer, outcome)
+            label = f"{book.book_id} {book.chunks_total}" if args.manifest else str(idx)
+            print(f"[{label}] {c.chunk_id}{' (resumed)' if carried else ''}", flush=True)
+        for book in books:
+            flush_submits(book, writer)
+            book.finish(writer)
+    finally:
+        for book in books:
+            book.close()
+    if writer is not None:
+        writer.close()
+    rt.cache.close()
+    rt.http.close()
+    metrics_report = rt.metrics.report()
+    metrics_report_out.write_text(json.dumps(metrics_report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    summary: Dict[str, Any] = {
+        "chunks_total": sum(b.chunks_total for b in books),
+        "request_tokens_est": dict(
+            distribution([t for b in books for t in b.request_tokens]),
+            estimator=args.token_estimator,
+            prompt_overhead=prompt_overhead,
+        ),
+        "resumed_chunks": sum(b.resumed_count for b in books),
+        "api_success_chunks": sum(b.success_calls for b in books),
+        "submitted_drafts_ok": sum(b.submit_ok for b in books),
+        "retried_submits": sum(b.retried_submits for b in books),
+        "cache": rt.cache.stats(),
+        "http": rt.http.stats(),
+        "retry": rt.retry.stats(),
+        "dedup": rt.dedup.stats(),
+        "sqlite_writer": writer.stats() if writer is not None else None,
+        "stages": {
+            s: {k: v[k] for k in ("sec", "share", "calls", "errors", "prompt_tokens", "completion_tokens")}
+            for s, v in metrics_report["stages"].items()
+        },
+        "yield": metrics_report["yield"],
+        "metrics_report": str(metrics_report_out),
+    }
+    if args.manifest:
+        summary["books"] = [b.summary() for b in books]
+    else:
+        book = books[0]
+        if book.incremental is not None:
+            summary["incremental"] = book.incremental
+        if book.budget is not None:
+            summary["budget"] = book.budget
+        summary.update(
+            raw_out=str(book.raw_out),
+            candidates_out=str(book.cand_out),
+            submit_out=str(book.submit_out),
+            metrics_out=str(book.metrics_out),
+        )
+    print(json.dumps(summary, ensure_ascii=False))
     return 0
 
 
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Qwen chat/completions endpoint used by l0_extract_qwen35.py.
+Purpose:
+1) Replay recorded responses (llm_cache.sqlite exact matches, then raw_results.jsonl round-robin).
+2) Fall back to synthetic extraction/verifier responses.
+3) Inject latency and 429/5xx/malformed-JSON errors.
+Point the extractor at it with --base-url http://127.0.0.1:<port>/v1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from l0_extract_qwen35 import (  # noqa: E402
+    VERIFY_BATCH_SYSTEM_PROMPT,
+    VERIFY_SYSTEM_PROMPT,
+    ResponseCache,
+    estimate_tokens_heuristic,
+)
+from l0_parse_bench import load_recorded, synthetic_response  # noqa: E402
+
+# Minimal copy of the l0_engine.db tables (lib/l0-engine.ts) for throwaway benchmark databases.
+L0_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS l0_principles (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  principle_key TEXT NOT NULL,
+  version INTEGER NOT NULL,
+  status TEXT NOT NULL CHECK (status IN ('DRAFT', 'READY', 'PUBLISHED', 'REJECTED', 'NEED_EVIDENCE')),
+  claim TEXT NOT NULL,
+  mechanism TEXT NOT NULL,
+  control_variables TEXT NOT NULL DEFAULT '{}',
+  expected_effects TEXT NOT NULL DEFAULT '[]',
+  boundary_conditions TEXT NOT NULL DEFAULT '[]',
+  counter_examples TEXT NOT NULL DEFAULT '[]',
+  evidence_level TEXT NOT NULL DEFAULT 'medium',
+  confidence REAL NOT NULL DEFAULT 0.7,
+  change_reason TEXT NOT NULL,
+  proposer TEXT NOT NULL,
+  reviewer TEXT,
+  publisher TEXT,
+  review_note TEXT,
+  publish_note TEXT,
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  reviewed_at TEXT,
+  published_at TEXT,
+  UNIQUE(principle_key, version)
+);
+CREATE TABLE IF NOT EXISTS l0_citations (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  l0_id INTEGER NOT NULL,
+  source_title TEXT NOT NULL,
+  source_type TEXT NOT NULL DEFAULT 'book',
+  reliability_tier TEXT NOT NULL DEFAULT 'A',
+  source_uri TEXT,
+  locator TEXT,
+  evidence_snippet TEXT NOT NULL,
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  FOREIGN KEY (l0_id) REFERENCES l0_principles(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_l0_principles_status ON l0_principles(status);
+CREATE INDEX IF NOT EXISTS idx_l0_principles_key ON l0_principles(principle_key);
+CREATE INDEX IF NOT EXISTS idx_l0_citations_l0_id ON l0_citations(l0_id);
+"""
+
+
+def init_l0_db(path: Path) -> None:
+    con = sqlite3.connect(str(path))
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(L0_SCHEMA_SQL)
+    con.close()
+
+
+class FakeQwen:
+    """Response source + fault injection shared by all request handler threads."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_kinds: Tuple[str, ...] = ("429", "500", "malformed"),
+        replay: Optional[List[Dict[str, Any]]] = None,
+        replay_cache: Optional[Path] = None,
+        seed: int = 11,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_kinds = error_kinds
+        self.replay = replay or []
+        self.cache = sqlite3.connect(str(replay_cache), check_same_thread=False) if replay_cache else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next = 0
+        self.counts: Dict[str, int] = {"extract": 0, "verify": 0, "verify_batch": 0, "errors": 0, "replayed": 0}
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def fault(self) -> Optional[str]:
+        with self._lock:
+            if self.error_rate <= 0 or self._rng.random() >= self.error_rate:
+                return None
+            return self._rng.choice(self.error_kinds)
+
+    def delay(self) -> None:
+        with self._lock:
+            ms = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def content_for(self, payload: Dict[str, Any]) -> str:
+        messages = payload.get("messages") or [{}, {}]
+        sys_prompt = str(messages[0].get("content") or "")
+        usr_prompt = str(messages[-1].get("content") or "")
+        if sys_prompt == VERIFY_BATCH_SYSTEM_PROMPT:
+            self._bump("verify_batch")
+            try:
+                body = usr_prompt.split("候选JSON数组：\n", 1)[1].split("\n\n输出JSON", 1)[0]
+                n = len(json.loads(body))
+            except (IndexError, ValueError):
+                n = 0
+            with self._lock:
+                results = [
+                    {"index": i, "decision": self._rng.choice(["pass", "pass", "need_evidence", "reject"]), "reason": "fake"}
+                    for i in range(n)
+                ]
+            return json.dumps({"results": results}, ensure_ascii=False)
+        if sys_prompt == VERIFY_SYSTEM_PROMPT:
+            self._bump("verify")
+            with self._lock:
+                decision = self._rng.choice(["pass", "pass", "need_evidence", "reject"])
+            return json.dumps({"decision": decision, "reason": "fake"}, ensure_ascii=False)
+
+        self._bump("extract")
+        if self.cache is not None:
+            key = ResponseCache.key(str(payload.get("model") or ""), sys_prompt, usr_prompt)
+            with self._lock:
+                row = self.cache.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._bump("replayed")
+                res = json.loads(row[0])
+                return str(((res.get("choices") or [{}])[0].get("message") or {}).get("content") or "")
+        with self._lock:
+            if self.replay:
+                resp = self.replay[self._next % len(self.replay)]
+                self._next += 1
+                self.counts["replayed"] += 1
+            else:
+                resp = synthetic_response(self._rng)
+        return json.dumps(resp, ensure_ascii=False)
+
+
+def make_handler(fake: FakeQwen) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Send status, headers and body as one segment (flushed by handle_one_request);
+        # split small writes on a keep-alive socket stall ~40 ms on Nagle/delayed ACK.
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            with fake._lock:
+                body = json.dumps(fake.counts).encode("utf-8")
+            self._send(200, body)
+
+        def do_POST(self) -> None:
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n)
+            fake.delay()
+            kind = fake.fault()
+            if kind is not None:
+                fake._bump("errors")
+            if kind == "429":
+                self._send(429, b'{"error":"rate limited"}', {"Retry-After": "1"})
+                return
+            if kind in {"500", "502", "503"}:
+                self._send(int(kind), b'{"error":"upstream"}')
+                return
+            try:
+                payload = json.loads(raw.decode("utf-8"))
+            except ValueError:
+                self._send(400, b'{"error":"bad json"}')
+                return
+            content = "not json {" if kind == "malformed" else fake.content_for(payload)
+            usr = str((payload.get("messages") or [{}])[-1].get("content") or "")
+            out = {
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {
+                    "prompt_tokens": estimate_tokens_heuristic(usr),
+                    "completion_tokens": estimate_tokens_heuristic(content),
+                    "total_tokens": estimate_tokens_heuristic(usr) + estimate_tokens_heuristic(content),
+                },
+            }
+            self._send(200, json.dumps(out, ensure_ascii=False).encode("utf-8"))
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def start_server(fake: FakeQwen, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve `fake` on a daemon thread; port 0 picks a free port (see server.server_address)."""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Fake Qwen chat/completions endpoint for offline L0 runs")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8799)
+    p.add_argument("--latency-ms", type=float, default=800.0)
+    p.add_argument("--jitter-ms", type=float, default=200.0)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--error-kinds", default="429,500,malformed")
+    p.add_argument("--replay", action="append", default=[], help="raw_results.jsonl to replay round-robin (repeatable)")
+    p.add_argument("--replay-cache", default="", help="llm_cache.sqlite for exact prompt replay")
+    p.add_argument("--seed", type=int, default=11)
+    args = p.parse_args()
+
+    fake = FakeQwen(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_kinds=tuple(x.strip() for x in args.error_kinds.split(",") if x.strip()),
+        replay=load_recorded(args.replay),
+        replay_cache=Path(args.replay_cache) if args.replay_cache else None,
+        seed=args.seed,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    server.daemon_threads = True
+    print(f"fake qwen listening on http://{args.host}:{args.port}/v1 (GET / for counters)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Bulk importer: l0_candidates.jsonl -> l0_engine.db.
+Purpose:
+1) Load drafts extracted elsewhere (any l0_extract_qwen35.py run) without re-running the model.
+2) Keep only the chosen verifier decisions (pass -> DRAFT, need_evidence -> NEED_EVIDENCE, reject -> REJECTED).
+3) Insert in large transactions with secondary indexes dropped (only once there is something to
+   insert) and rebuilt once at the end; an import killed mid-load rebuilds them on the next run.
+4) Stay idempotent: every imported (source, chunk_id, idx, chunk content hash) is recorded in l0_import_ledger and
+   skipped next time; a chunk an --incremental run re-extracted after an edit gets new keys and is loaded again.
+   Ledger keys written before the content hash was added still count for their (chunk_id, idx), so drafts
+   imported by an older importer need a new --source once their chunk changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from l0_extract_qwen35 import SqliteDraftWriter  # noqa: E402
+
+DECISION_STATUS = {"pass": "DRAFT", "need_evidence": "NEED_EVIDENCE", "reject": "REJECTED"}
+
+LEDGER_SQL = """
+CREATE TABLE IF NOT EXISTS l0_import_ledger (
+  source_key TEXT PRIMARY KEY,
+  l0_id INTEGER NOT NULL,
+  imported_at TEXT NOT NULL DEFAULT (datetime('now'))
+)
+"""
+
+# Indexes dropped by an import still in progress (or killed); recreated by restore_indexes.
+DEFERRED_SQL = """
+CREATE TABLE IF NOT EXISTS l0_import_deferred_indexes (
+  name TEXT PRIMARY KEY,
+  sql TEXT NOT NULL
+)
+"""
+
+
+def source_for(path: Path, override: str) -> str:
+    """Ledger namespace of a candidates file: --source, else the run's book_id, else its directory name."""
+    if override:
+        return override
+    manifest = path.parent / "chunk_manifest.json"
+    if manifest.exists():
+        try:
+            book_id = json.loads(manifest.read_text(encoding="utf-8")).get("book_id")
+            if book_id:
+                return str(book_id)
+        except ValueError:
+            pass
+    return path.parent.name
+
+
+def deferred_indexes(writer: SqliteDraftWriter) -> List[Tuple[str, str]]:
+    """(name, sql) of indexes a previous import dropped and never rebuilt."""
+    return [(str(n), str(q)) for n, q in writer.con.execute("SELECT name, sql FROM l0_import_deferred_indexes")]
+
+
+def chunk_hashes(path: Path) -> Dict[str, str]:
+    """chunk_id -> content sha256 from the run's chunk_manifest.json next to a candidates file."""
+    manifest = path.parent / "chunk_manifest.json"
+    if not manifest.exists():
+        return {}
+    try:
+        chunks = json.loads(manifest.read_text(encoding="utf-8")).get("chunks") or []
+    except (ValueError, AttributeError):
+        return {}
+    return {str(e["chunk_id"]): str(e["sha256"]) for e in chunks if isinstance(e, dict) and e.get("chunk_id") and e.get("sha256")}
+
+
+def defer_indexes(writer: SqliteDraftWriter) -> List[Tuple[str, str]]:
+    """Drop the secondary indexes on the L0 tables; returns (name, sql) to recreate them.
+
+    Their definitions are recorded in the same transaction, so a crash before
+    restore_indexes leaves them to be rebuilt by the next import.
+    """
+    con = writer.con
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        rows = con.execute(
+            "SELECT name, sql FROM sqlite_master"
+            " WHERE type = 'index' AND tbl_name IN ('l0_principles', 'l0_citations') AND sql IS NOT NULL"
+        ).fetchall()
+        for name, sql in rows:
+            con.execute("INSERT OR REPLACE INTO l0_import_deferred_indexes (name, sql) VALUES (?, ?)", (name, sql))
+            con.execute(f'DROP INDEX IF EXISTS "{name}"')
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return deferred_indexes(writer)
+
+
+def restore_indexes(writer: SqliteDraftWriter, indexes: List[Tuple[str, str]]) -> None:
+    if not indexes:
+        return
+    con = writer.con
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        for name, sql in indexes:
+            con.execute(sql.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1))
+            con.execute("DELETE FROM l0_import_deferred_indexes WHERE name = ?", (name,))
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Bulk-load l0_candidates.jsonl into l0_engine.db")
+    p.add_argument("--candidates", action="append", required=True, help="l0_candidates.jsonl path (repeatable)")
+    p.add_argument("--sqlite-db", required=True)
+    p.add_argument("--decisions", default="pass,need_evidence", help="verifier decisions to import (pass,need_evidence,reject)")
+    p.add_argument("--source", default="", help="ledger namespace for all inputs (default: run book_id or dir name)")
+    p.add_argument("--batch-size", type=int, default=2000, help="drafts per transaction")
+    p.add_argument("--keep-indexes", action="store_true", help="do not drop/rebuild secondary indexes around the load")
+    p.add_argument("--db-busy-timeout-ms", type=int, default=10000)
+    args = p.parse_args()
+
+    decisions = {d.strip() for d in args.decisions.split(",") if d.strip()}
+    unknown = decisions - set(DECISION_STATUS)
+    if unknown:
+        print(f"fatal: unsupported --decisions: {','.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    paths = [Path(x) for x in args.candidates]
+    for path in paths:
+        if not path.exists():
+            print(f"fatal: candidates not found: {path}", file=sys.stderr)
+            return 2
+    if not Path(args.sqlite_db).exists():
+        print(f"fatal: sqlite db not found: {args.sqlite_db}", file=sys.stderr)
+        return 2
+
+    counts: Dict[str, int] = {"read": 0, "filtered": 0, "already_imported": 0, "bad": 0, "inserted": 0, "failed": 0}
+    errors: List[str] = []
+    t0 = time.perf_counter()
+    with SqliteDraftWriter(args.sqlite_db, args.db_busy_timeout_ms) as writer:
+        writer.con.execute(LEDGER_SQL)
+        writer.con.execute(DEFERRED_SQL)
+        recovered = deferred_indexes(writer)
+        restore_indexes(writer, recovered)
+        seen: Set[str] = {r[0] for r in writer.con.execute("SELECT source_key FROM l0_import_ledger")}
+        indexes: List[Tuple[str, str]] = []
+        deferred = args.keep_indexes
+        items: List[Tuple[Dict[str, Any], str]] = []
+        sources: List[str] = []
+
+        def flush() -> None:
+            nonlocal indexes, deferred
+            if not items:
+                return
+            if not deferred:
+                indexes, deferred = defer_indexes(writer), True
+            for ok, detail in writer.write_batch(items, sources):
+                if ok:
+                    counts["inserted"] += 1
+                else:
+                    counts["failed"] += 1
+                    if len(errors) < 20:
+                        errors.append(detail)
+            items.clear()
+            sources.clear()
+
+        try:
+            for path in paths:
+                source = source_for(path, args.source)
+                hashes = chunk_hashes(path)
+                with path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        counts["read"] += 1
+                        try:
+                            cand = json.loads(line)
+                            legacy = f"{source}:{cand['chunk_id']}#{int(cand['idx'])}"
+                            sha = hashes.get(str(cand["chunk_id"]))
+                            key = f"{legacy}@{sha[:16]}" if sha else legacy
+                            decision = str((cand.get("verifier") or {}).get("decision") or "")
+                            draft = cand["draft"]
+                        except (ValueError, KeyError, TypeError):
+                            counts["bad"] += 1
+                            continue
+                        if decision not in decisions:
+                            counts["filtered"] += 1
+                            continue
+                        if key in seen or legacy in seen:
+                            counts["already_imported"] += 1
+                            continue
+                        seen.add(key)
+                        items.append((draft, DECISION_STATUS[decision]))
+                        sources.append(key)
+                        if len(items) >= max(1, args.batch_size):
+                            flush()
+            flush()
+        finally:
+            t_idx = time.perf_counter()
+            restore_indexes(writer, indexes)
+            index_sec = time.perf_counter() - t_idx
+        stats = writer.stats()
+
+    elapsed = time.perf_counter() - t0
+    print(
+        json.dumps(
+            dict(
+                counts,
+                decisions=sorted(decisions),
+                elapsed_sec=round(elapsed, 3),
+                drafts_per_sec=round(counts["inserted"] / elapsed, 1) if elapsed > 0 else None,
+                transactions=stats["transactions"],
+                indexes_rebuilt=[n for n, _ in indexes],
+                indexes_recovered=[n for n, _ in recovered],
+                index_rebuild_sec=round(index_sec, 3),
+                errors=errors,
+            ),
+            ensure_ascii=False,
+        )
+    )
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the L0 response parse/validate path.
+Replays recorded model responses (raw_results.jsonl from l0_extract_qwen35.py) or
+synthetic ones through extract_json_block -> parse_principles -> rule_verify_candidate
+-> build_l0_draft and reports per-stage cost. `dict_path_verify_and_draft` times the
+baseline dict-walking verifier/draft builder (kept below) on the same candidates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from l0_extract_qwen35 import (  # noqa: E402
+    PARAM_KEYS,
+    Chunk,
+    build_l0_draft,
+    extract_json_block,
+    parse_non_l0,
+    parse_principles,
+    rule_verify_candidate,
+    to_snake_key,
+)
+
+
+# Baseline: the dict-based verifier and draft builder that predate L0Candidate.
+def baseline_has_params(params: Dict[str, Any]) -> bool:
+    if not isinstance(params, dict):
+        return False
+    for k in PARAM_KEYS:
+        v = params.get(k)
+        if isinstance(v, dict):
+            for vv in v.values():
+                if vv is not None and str(vv).strip() != "":
+                    return True
+        elif v is not None and str(v).strip() != "":
+            return True
+    return False
+
+
+def baseline_rule_verify(candidate: Dict[str, Any]) -> Dict[str, str]:
+    statement = str(candidate.get("statement") or "").strip()
+    mechanism = str(candidate.get("mechanism") or "").strip()
+    cause_effect = str(candidate.get("cause_effect") or "").strip()
+    evidence = candidate.get("evidence") or {}
+    locator = str((evidence or {}).get("locator") or "").strip()
+    quote = str((evidence or {}).get("quote") or "").strip()
+    boundaries = candidate.get("boundary_conditions") or []
+    has_params = baseline_has_params(candidate.get("parameters") or {})
+    has_evidence = bool(locator) and bool(quote)
+    has_boundary = isinstance(boundaries, list) and len(boundaries) > 0
+    has_mechanism = bool(mechanism) or bool(cause_effect)
+    if not statement:
+        return {"decision": "reject", "reason": "missing statement"}
+    if not has_mechanism and not has_params and not has_evidence:
+        return {"decision": "reject", "reason": "missing mechanism/params/evidence"}
+    if has_mechanism and has_params and has_evidence and has_boundary:
+        return {"decision": "pass", "reason": "rule check passed"}
+    return {"decision": "need_evidence", "reason": "rule check incomplete fields"}
+
+
+def baseline_build_draft(book_title: str, chunk: Chunk, p: Dict[str, Any], proposer: str) -> Dict[str, Any]:
+    statement = str(p.get("statement") or "").strip()
+    mechanism = str(p.get("mechanism") or "").strip()
+    evidence = p.get("evidence") or {}
+    quote = str((evidence or {}).get("quote") or "").strip()
+    locator = str((evidence or {}).get("locator") or f"{chunk.chapter_id}:{chunk.line_start}-{chunk.line_end}").strip()
+    try:
+        conf = float(p.get("confidence"))
+    except Exception:
+        conf = 0.6
+    conf = max(0.0, min(1.0, conf))
+    boundaries = p.get("boundary_conditions")
+    if not isinstance(boundaries, list) or len(boundaries) == 0:
+        boundaries = [f"source_locator={locator}"]
+    params = p.get("parameters")
+    if not isinstance(params, dict):
+        params = {}
+    principle_key = to_snake_key(statement if statement else mechanism) or f"{chunk.chunk_id}_candidate"
+    return {
+        "principle_key": principle_key,
+        "claim": statement[:500] if statement else f"candidate from {chunk.chunk_id}",
+        "mechanism": mechanism[:1200] if mechanism else "pending mechanism completion",
+        "boundary_conditions": boundaries,
+        "control_variables": params,
+        "expected_effects": [],
+        "counter_examples": [],
+        "evidence_level": "medium",
+        "confidence": conf,
+        "change_reason": f"auto extraction from {book_title} {chunk.chapter_id} lines {chunk.line_start}-{chunk.line_end}",
+        "proposer": proposer,
+        "citations": [
+            {
+                "source_title": book_title,
+                "source_type": "book",
+                "reliability_tier": "S",
+                "locator": locator,
+                "evidence_snippet": quote[:240] if quote else chunk.text[:240],
+            }
+        ],
+    }
+
+
+def load_recorded(paths: List[str]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec.get("response"), dict):
+                    out.append(rec["response"])
+    return out
+
+
+def synthetic_response(rng: random.Random) -> Dict[str, Any]:
+    principles = []
+    for i in range(rng.randint(0, 10)):
+        principles.append(
+            {
+                "statement": f"蛋白质在{rng.randint(40, 90)}°C 加热 {rng.randint(1, 30)} 分钟发生变性 #{i}",
+                "mechanism": "heat disrupts hydrogen bonds and unfolds the protein" if rng.random() < 0.8 else "",
+                "parameters": {
+                    "temperature_c": {"min": rng.choice([None, 60]), "max": rng.choice([None, 80])},
+                    "time_min": {"min": None, "max": rng.choice([None, 10])},
+                    "ph": {"min": None, "max": None},
+                    "water_activity": {"min": None, "max": None},
+                    "other": {},
+                },
+                "cause_effect": "heating -> denaturation" if rng.random() < 0.7 else "",
+                "boundary_conditions": ["fresh egg white"] if rng.random() < 0.6 else [],
+                "evidence": {"source_type": "book_quote", "locator": "ch01 p12", "quote": "proteins unfold when heated"}
+                if rng.random() < 0.7
+                else {},
+                "confidence": rng.random(),
+                "category": "protein",
+                "tags": ["protein", "heat"],
+            }
+        )
+    return {"principles": principles, "non_l0_content": [{"statement": "recipe step", "reason": "仅操作步骤"}]}
+
+
+def timed(fn: Callable[[], int], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        items = fn()
+        best = min(best, time.perf_counter() - t0)
+    return {"sec": round(best, 4), "items": items, "items_per_sec": round(items / best, 1) if best > 0 else None}
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark L0 response parsing and validation")
+    p.add_argument("--raw", action="append", default=[], help="raw_results.jsonl to replay (repeatable)")
+    p.add_argument("--synthetic", type=int, default=5000, help="synthetic responses to add")
+    p.add_argument("--fenced-ratio", type=float, default=0.1, help="share of responses wrapped in ```json fences")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--seed", type=int, default=7)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    responses = load_recorded(args.raw) + [synthetic_response(rng) for _ in range(max(0, args.synthetic))]
+    if not responses:
+        print("fatal: no responses to benchmark", file=sys.stderr)
+        return 2
+    texts = []
+    for r in responses:
+        t = json.dumps(r, ensure_ascii=False)
+        texts.append(f"```json\n{t}\n```" if rng.random() < args.fenced_ratio else t)
+    chunk = Chunk("bench_s001", "bench", "bench.sec001", "bench text " * 40, 1, 40)
+
+    parsed = [extract_json_block(t) for t in texts]
+    records = [pp for d in parsed for _, pp in parse_principles(d)]
+    raw_dicts = [pp.raw for pp in records]
+
+    def parse() -> int:
+        for t in texts:
+            extract_json_block(t)
+        return len(texts)
+
+    def normalize() -> int:
+        return sum(len(parse_principles(d)) + len(parse_non_l0(d)) for d in parsed)
+
+    def verify() -> int:
+        for pp in records:
+            rule_verify_candidate(pp)
+        return len(records)
+
+    def draft() -> int:
+        for pp in records:
+            build_l0_draft("bench", chunk, pp, "bench")
+        return len(records)
+
+    def dict_path() -> int:
+        for d in raw_dicts:
+            baseline_rule_verify(d)
+            baseline_build_draft("bench", chunk, d, "bench")
+        return len(raw_dicts)
+
+    def end_to_end() -> int:
+        for t in texts:
+            for _, pp in parse_principles(extract_json_block(t)):
+                rule_verify_candidate(pp)
+                build_l0_draft("bench", chunk, pp, "bench")
+        return len(texts)
+
+    print(
+        json.dumps(
+            {
+                "responses": len(texts),
+                "candidates": len(records),
+                "parse": timed(parse, args.repeat),
+                "normalize": timed(normalize, args.repeat),
+                "rule_verify": timed(verify, args.repeat),
+                "build_draft": timed(draft, args.repeat),
+                "dict_path_verify_and_draft": timed(dict_path, args.repeat),
+                "end_to_end_responses": timed(end_to_end, args.repeat),
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
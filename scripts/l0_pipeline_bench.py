@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for l0_extract_qwen35.py.
+Starts the fake Qwen endpoint in-process, runs the extractor once per
+(workers, db-batch, verify-batch-size) combination against a throwaway l0_engine.db,
+and reports chunks/sec, model calls per principle, latency percentiles and DB rows/sec.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from l0_fake_qwen import FakeQwen, init_l0_db, start_server  # noqa: E402
+from l0_parse_bench import load_recorded  # noqa: E402
+
+EXTRACTOR = Path(__file__).resolve().parent / "l0_extract_qwen35.py"
+
+
+def int_list(raw: str) -> List[int]:
+    return [int(x) for x in raw.split(",") if x.strip()]
+
+
+def run_once(args: argparse.Namespace, base_url: str, workdir: Path, workers: int, db_batch: int, verify_batch: int) -> Dict[str, Any]:
+    tag = f"w{workers}_b{db_batch}_v{verify_batch}"
+    db = workdir / f"{tag}.db"
+    init_l0_db(db)
+    cmd = [
+        sys.executable,
+        str(EXTRACTOR),
+        "--input",
+        args.input,
+        "--api-key",
+        "offline",
+        "--base-url",
+        base_url,
+        "--sqlite-db",
+        str(db),
+        "--out-dir",
+        str(workdir / tag),
+        "--chunker",
+        "headings",
+        "--cache-mode",
+        "off",
+        "--max-chunks",
+        str(args.max_chunks),
+        "--workers",
+        str(workers),
+        "--db-batch",
+        str(db_batch),
+        "--verify-batch-size",
+        str(verify_batch),
+        "--rps",
+        str(args.rps),
+        "--verifier-mode",
+        args.verifier_mode,
+        "--backoff-base-sec",
+        "0.2",
+    ] + args.extra
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    wall = time.perf_counter() - t0
+    lines = [ln for ln in proc.stdout.splitlines() if ln.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"config": tag, "error": (proc.stderr or proc.stdout)[-400:]}
+    summary = json.loads(lines[-1])
+    with open(summary["candidates_out"], "r", encoding="utf-8") as f:
+        principles = sum(1 for _ in f)
+    http = summary.get("http") or {}
+    lat = http.get("latency_ms") or {}
+    chunks = summary.get("chunks_total") or 0
+    return {
+        "config": tag,
+        "chunks": chunks,
+        "wall_sec": round(wall, 2),
+        "chunks_per_sec": round(chunks / wall, 2) if wall > 0 else None,
+        "principles": principles,
+        "model_calls": http.get("requests"),
+        "calls_per_principle": round(http["requests"] / principles, 2) if principles and http.get("requests") else None,
+        "latency_p50_ms": lat.get("p50"),
+        "latency_p95_ms": lat.get("p95"),
+        "retries": (summary.get("retry") or {}).get("retries"),
+        "db_rows_per_sec": (summary.get("sqlite_writer") or {}).get("rows_per_sec"),
+    }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Offline L0 extraction throughput benchmark")
+    p.add_argument("--input", required=True, help="book markdown path")
+    p.add_argument("--max-chunks", type=int, default=40)
+    p.add_argument("--workers", default="1,4,8", help="comma-separated worker counts")
+    p.add_argument("--db-batch", default="1,50", help="comma-separated --db-batch values")
+    p.add_argument("--verify-batch-size", default="1,10", help="comma-separated --verify-batch-size values")
+    p.add_argument("--verifier-mode", choices=["auto", "qwen", "rules"], default="qwen")
+    p.add_argument("--rps", type=float, default=0.0, help="extractor --rps (0=unlimited)")
+    p.add_argument("--latency-ms", type=float, default=300.0)
+    p.add_argument("--jitter-ms", type=float, default=80.0)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--replay", action="append", default=[], help="raw_results.jsonl to replay (repeatable)")
+    p.add_argument("--workdir", default="", help="keep run artifacts here (default: temp dir)")
+    p.add_argument("extra", nargs=argparse.REMAINDER, help="extra extractor flags after --")
+    args = p.parse_args()
+    args.extra = [x for x in args.extra if x != "--"]
+
+    fake = FakeQwen(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        replay=load_recorded(args.replay),
+    )
+    server = start_server(fake)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    tmp = None
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="l0_bench_")
+        workdir = Path(tmp.name)
+
+    results = []
+    try:
+        for workers, db_batch, verify_batch in itertools.product(
+            int_list(args.workers), int_list(args.db_batch), int_list(args.verify_batch_size)
+        ):
+            row = run_once(args, base_url, workdir, workers, db_batch, verify_batch)
+            print(json.dumps(row, ensure_ascii=False), flush=True)
+            results.append(row)
+    finally:
+        server.shutdown()
+        if tmp is not None:
+            tmp.cleanup()
+
+    ok = [r for r in results if "error" not in r]
+    if ok:
+        best = max(ok, key=lambda r: r["chunks_per_sec"] or 0)
+        print(json.dumps({"runs": len(results), "fastest": best["config"], "server_counts": fake.counts}, ensure_ascii=False))
+    return 0 if len(ok) == len(results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
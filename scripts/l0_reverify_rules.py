@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Re-grade existing L0 candidates with rule_verify_candidate, in parallel and without model calls.
+Purpose:
+1) Re-run the (possibly tightened) rules over one or many l0_candidates.jsonl files on a process pool.
+2) Prefer the original model principle from the sibling raw_results.jsonl; fall back to rebuilding it from the draft
+   (drafts always carry a citation, so a draft-based verdict may lower a decision but never raise it).
+3) Rewrite the files with the new decisions (atomic replace) unless --dry-run.
+4) Print a decision-change report (old -> new transitions and sample changes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from l0_extract_qwen35 import rule_verify_candidate  # noqa: E402
+
+# build_l0_draft placeholders that mean "the model gave nothing here".
+PENDING_MECHANISM = "pending mechanism completion"
+
+DECISION_RANK = {"reject": 0, "need_evidence": 1, "pass": 2}
+
+
+def load_raw_principles(path: Path) -> Dict[str, List[Any]]:
+    """chunk_id -> `principles` list of its model response, from raw_results.jsonl."""
+    out: Dict[str, List[Any]] = {}
+    if not path.exists():
+        return out
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            resp = rec.get("response")
+            if isinstance(resp, dict) and isinstance(resp.get("principles"), list):
+                out[str(rec.get("chunk_id"))] = resp["principles"]
+    return out
+
+
+def principle_from_draft(draft: Dict[str, Any]) -> Dict[str, Any]:
+    """Approximate the model principle from an L0 draft (cause_effect is not kept in drafts)."""
+    claim = str(draft.get("claim") or "")
+    mechanism = str(draft.get("mechanism") or "")
+    boundaries = [b for b in draft.get("boundary_conditions") or [] if not str(b).startswith("source_locator=")]
+    cites = draft.get("citations") or [{}]
+    cite = cites[0] if isinstance(cites[0], dict) else {}
+    return {
+        "statement": "" if claim.startswith("candidate from ") else claim,
+        "mechanism": "" if mechanism == PENDING_MECHANISM else mechanism,
+        "parameters": draft.get("control_variables") or {},
+        "boundary_conditions": boundaries,
+        "evidence": {"locator": cite.get("locator") or "", "quote": cite.get("evidence_snippet") or ""},
+        "confidence": draft.get("confidence"),
+    }
+
+
+def regrade(batch: List[Tuple[str, Optional[Dict[str, Any]]]], mode: str) -> List[Tuple[str, str, str, str, bool]]:
+    """Worker: (line, raw principle or None) -> (new line, old decision, new decision, principle source, rewritten)."""
+    out: List[Tuple[str, str, str, str, bool]] = []
+    for line, raw in batch:
+        try:
+            cand = json.loads(line)
+        except ValueError:
+            out.append((line, "", "", "unparsed", False))
+            continue
+        old = dict(cand.get("verifier") or {})
+        old_decision = str(old.get("decision") or "")
+        if old_decision == "duplicate" or not isinstance(cand.get("draft"), dict):
+            out.append((line, old_decision, old_decision, "skipped", False))
+            continue
+        source = "raw" if raw is not None else "draft"
+        verdict = rule_verify_candidate(raw if raw is not None else principle_from_draft(cand["draft"]))
+        if mode == "auto" and verdict["decision"] == "need_evidence" and old_decision:
+            verdict = old  # auto: only decisive rule verdicts override an earlier (possibly model) decision
+        if (
+            source == "draft"
+            and old_decision in DECISION_RANK
+            and DECISION_RANK.get(verdict["decision"], 0) > DECISION_RANK[old_decision]
+        ):
+            verdict = old  # draft evidence may be the chunk locator/text placeholder, so it cannot upgrade
+        if verdict.get("decision") == old_decision and verdict.get("reason") == old.get("reason"):
+            out.append((line, old_decision, old_decision, source, False))
+            continue
+        cand["verifier"] = {"decision": verdict["decision"], "reason": verdict.get("reason", "")}
+        out.append((json.dumps(cand, ensure_ascii=False) + "\n", old_decision, verdict["decision"], source, True))
+    return out
+
+
+def iter_batches(
+    path: Path, raws: Dict[str, List[Any]], size: int
+) -> Iterator[List[Tuple[str, Optional[Dict[str, Any]]]]]:
+    batch: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            raw = None
+            if raws:
+                try:
+                    rec = json.loads(line)
+                    principles = raws.get(str(rec.get("chunk_id")))
+                    i = int(rec.get("idx")) - 1  # candidate idx is 1-based into `principles`
+                    if principles is not None and 0 <= i < len(principles) and isinstance(principles[i], dict):
+                        raw = principles[i]
+                except (ValueError, TypeError):
+                    pass
+            batch.append((line if line.endswith("\n") else line + "\n", raw))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def ordered_map(
+    pool: Executor, batches: Iterable[List[Tuple[str, Optional[Dict[str, Any]]]]], mode: str, in_flight: int
+) -> Iterator[List[Tuple[str, str, str, str, bool]]]:
+    """pool.map for regrade() with at most `in_flight` batches read ahead, so huge files stay bounded."""
+    pending: Deque[Future[List[Tuple[str, str, str, str, bool]]]] = deque()
+    for batch in batches:
+        pending.append(pool.submit(regrade, batch, mode))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Re-run rule verification over existing L0 candidate files")
+    p.add_argument("--candidates", action="append", required=True, help="l0_candidates.jsonl path (repeatable)")
+    p.add_argument("--mode", choices=["rules", "auto"], default="rules", help="auto: rule need_evidence keeps the old decision")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--batch-size", type=int, default=2000, help="candidates per worker task")
+    p.add_argument("--dry-run", action="store_true", help="report only; leave files untouched")
+    p.add_argument("--samples", type=int, default=20, help="changed candidates listed in the report")
+    args = p.parse_args()
+
+    paths = [Path(x) for x in args.candidates]
+    for path in paths:
+        if not path.exists():
+            print(f"fatal: candidates not found: {path}", file=sys.stderr)
+            return 2
+
+    t0 = time.perf_counter()
+    transitions: Dict[str, int] = {}
+    sources: Dict[str, int] = {}
+    samples: List[Dict[str, Any]] = []
+    total = 0
+    changed = 0
+    rewritten = 0
+    workers = max(1, args.workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in paths:
+            raws = load_raw_principles(path.parent / "raw_results.jsonl")
+            tmp = path.with_name(path.name + ".tmp")
+            out = None if args.dry_run else tmp.open("w", encoding="utf-8")
+            try:
+                batches = iter_batches(path, raws, max(1, args.batch_size))
+                for results in ordered_map(pool, batches, args.mode, workers * 2):
+                    for new_line, old, new, source, touched in results:
+                        total += 1
+                        sources[source] = sources.get(source, 0) + 1
+                        rewritten += int(touched)
+                        if old != new:
+                            changed += 1
+                            transitions[f"{old or '-'}->{new}"] = transitions.get(f"{old or '-'}->{new}", 0) + 1
+                            if len(samples) < args.samples:
+                                rec = json.loads(new_line)
+                                samples.append(
+                                    {
+                                        "file": str(path),
+                                        "chunk_id": rec.get("chunk_id"),
+                                        "idx": rec.get("idx"),
+                                        "old": old,
+                                        "new": new,
+                                        "reason": rec["verifier"].get("reason"),
+                                    }
+                                )
+                        if out is not None:
+                            out.write(new_line)
+            except BaseException:
+                if out is not None:
+                    out.close()
+                    tmp.unlink(missing_ok=True)
+                raise
+            if out is not None:
+                out.close()
+                os.replace(tmp, path)
+
+    elapsed = time.perf_counter() - t0
+    print(
+        json.dumps(
+            {
+                "files": [str(x) for x in paths],
+                "mode": args.mode,
+                "candidates": total,
+                "changed": changed,
+                "rewritten": rewritten,
+                "transitions": dict(sorted(transitions.items(), key=lambda kv: -kv[1])),
+                "principle_source": sources,
+                "written": not args.dry_run,
+                "elapsed_sec": round(elapsed, 3),
+                "candidates_per_sec": round(total / elapsed, 1) if elapsed > 0 else None,
+                "samples": samples,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,8 +4,10 @@
 Pipeline:
 1) Query YouTube feed entries (Atom feed)
 2) Relevance scoring by keywords
-3) Transcript extraction (yt-dlp first, then page parsing fallback)
-4) Markdown export
+3) Transcript extraction (local cache, then yt-dlp, then page parsing fallback), optionally on a bounded pool;
+   yt-dlp subtitle metadata is resolved in batches (yt_dlp library in-process, else one CLI call per batch)
+4) Streaming Markdown export: each section is written as soon as it is ready, the index last
+   (--sync: only playlist videos not seen before, appended to the existing report)
 """
 
 from __future__ import annotations
@@ -13,19 +15,29 @@ from __future__ import annotations
 import argparse
 import html
 import json
+import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
 import textwrap
+import threading
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import IO, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 
 DEFAULT_OUTPUT = "output/youtube_food_transcripts.md"
+DEFAULT_CACHE = "output/youtube_transcript_cache.sqlite"
+SYNC_SEEN_LIMIT = 5000
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -49,14 +61,61 @@ class TranscriptResult:
     language: str
     text: str
     method: str
+    cached: bool = False
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rps seconds apart, shared by all worker threads."""
+
+    def __init__(self, rps: float = 0.0) -> None:
+        self.lock = threading.Lock()
+        self.next_at: Dict[str, float] = {}
+        self.set_rps(rps)
+
+    def set_rps(self, rps: float) -> None:
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+
+    def wait(self, url: str) -> None:
+        if self.interval <= 0:
+            return
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at.get(host, 0.0))
+            self.next_at[host] = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+HOST_LIMITER = HostRateLimiter()
 
 
 def http_get(url: str, timeout: int = 20) -> str:
+    HOST_LIMITER.wait(url)
     req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
     with urllib.request.urlopen(req, timeout=timeout) as resp:
         return resp.read().decode("utf-8", errors="replace")
 
 
+def http_get_conditional(url: str, etag: str = "", last_modified: str = "", timeout: int = 20) -> Tuple[Optional[str], str, str]:
+    """GET with If-None-Match / If-Modified-Since; returns (body or None on 304, etag, last_modified)."""
+    HOST_LIMITER.wait(url)
+    headers = {"User-Agent": USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read().decode("utf-8", errors="replace")
+            return body, resp.headers.get("ETag") or "", resp.headers.get("Last-Modified") or ""
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag, last_modified
+        raise
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="YouTube high-relevance video transcript collector")
     parser.add_argument("--query", required=True, help="YouTube search query")
@@ -92,6 +151,38 @@ def parse_args() -> argparse.Namespace:
         default=[],
         help="YouTube playlist URL (repeatable). Script will expand all videos in playlist.",
     )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="With --playlist-url: conditional feed requests, transcribe only unseen videos and append them to --output",
+    )
+    parser.add_argument("--sync-state", default="", help="Per-playlist sync state JSON (default: <output>.sync.json)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Videos transcribed in parallel")
+    parser.add_argument(
+        "--ytdlp-batch-size",
+        type=int,
+        default=25,
+        help="Videos per yt-dlp subtitle lookup (library in-process if installed, else one CLI call); 0=one process per video",
+    )
+    parser.add_argument(
+        "--transcript-cache",
+        default=DEFAULT_CACHE,
+        help="SQLite transcript/feed cache path (empty string disables the cache)",
+    )
+    parser.add_argument("--cache-max-mb", type=float, default=256.0, help="Evict least recently used transcripts above this size")
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument("--refresh", action="store_true", help="Ignore cached transcripts and feeds, re-download and overwrite them")
+    cache_mode.add_argument(
+        "--cache-only",
+        action="store_true",
+        help="Never touch the network: use cached feeds and transcripts only (uncached videos are unavailable)",
+    )
+    parser.add_argument(
+        "--host-rps",
+        type=float,
+        default=2.0,
+        help="Max requests per second to any single host across all workers (0=unlimited)",
+    )
     return parser.parse_args()
 
 
@@ -196,10 +287,15 @@ def playlist_id_from_url(url: str) -> str:
     return qs.get("list", [""])[0].strip()
 
 
+def playlist_feed_url(playlist_id: str) -> str:
+    return f"https://www.youtube.com/feeds/videos.xml?playlist_id={urllib.parse.quote_plus(playlist_id)}"
+
+
 def fetch_playlist_feed(playlist_id: str) -> List[VideoEntry]:
-    feed_url = f"https://www.youtube.com/feeds/videos.xml?playlist_id={urllib.parse.quote_plus(playlist_id)}"
-    xml_text = http_get(feed_url)
+    return parse_playlist_feed(http_get(playlist_feed_url(playlist_id)))
+
 
+def parse_playlist_feed(xml_text: str) -> List[VideoEntry]:
     ns = {
         "atom": "http://www.w3.org/2005/Atom",
         "yt": "http://www.youtube.com/xml/schemas/2015",
@@ -290,27 +386,40 @@ def rank_videos(
     return scored[:max_videos]
 
 
-def extract_transcript_with_ytdlp(video_url: str, preferred_langs: List[str]) -> Optional[TranscriptResult]:
-    ytdlp = shutil.which("yt-dlp")
-    if not ytdlp:
-        return None
-
-    # Try preferred languages first (manual/auto subtitles)
-    lang_selector = ",".join(preferred_langs)
-    cmd = [
-        ytdlp,
+def ytdlp_subtitle_args(preferred_langs: List[str]) -> List[str]:
+    return [
         "--skip-download",
         "--write-auto-sub",
         "--write-sub",
         "--sub-langs",
-        lang_selector,
+        ",".join(preferred_langs),
         "--sub-format",
         "json3",
-        "--print",
-        "%(requested_subtitles)s",
-        video_url,
     ]
 
+
+def transcript_from_subtitles(subtitle_meta: Dict[str, Any], preferred_langs: List[str]) -> Optional[TranscriptResult]:
+    """First downloadable json3 track of a `requested_subtitles` dict, preferred languages first."""
+    ordered = [lang for lang in preferred_langs if lang in subtitle_meta]
+    ordered += [lang for lang in subtitle_meta if lang not in preferred_langs]
+    for lang in ordered:
+        item = subtitle_meta.get(lang)
+        if isinstance(item, dict) and item.get("url"):
+            text = json3_url_to_text(item["url"])
+            if text:
+                return TranscriptResult(language=str(lang), text=text, method="yt-dlp")
+    return None
+
+
+def extract_transcript_with_ytdlp(video_url: str, preferred_langs: List[str]) -> Optional[TranscriptResult]:
+    ytdlp = shutil.which("yt-dlp")
+    if not ytdlp:
+        return None
+
+    # Try preferred languages first (manual/auto subtitles); `j` prints requested_subtitles as real JSON
+    cmd = [ytdlp] + ytdlp_subtitle_args(preferred_langs) + ["--print", "%(requested_subtitles)j", video_url]
+
+    HOST_LIMITER.wait(video_url)
     try:
         p = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=90)
     except Exception:
@@ -319,34 +428,144 @@ def extract_transcript_with_ytdlp(video_url: str, preferred_langs: List[str]) ->
     if p.returncode != 0:
         return None
 
-    # requested_subtitles prints JSON-ish dict where each lang has url/ext
     data = p.stdout.strip().splitlines()
     if not data:
         return None
 
-    raw = data[-1].strip()
     try:
-        subtitle_meta = json.loads(raw.replace("'", '"')) if raw.startswith("{") else None
-    except Exception:
-        subtitle_meta = None
+        subtitle_meta = json.loads(data[-1])
+    except ValueError:
+        return None
 
     if isinstance(subtitle_meta, dict):
-        for lang in preferred_langs:
-            item = subtitle_meta.get(lang)
-            if isinstance(item, dict) and item.get("url"):
-                text = json3_url_to_text(item["url"])
-                if text:
-                    return TranscriptResult(language=lang, text=text, method="yt-dlp")
-
-        for lang, item in subtitle_meta.items():
-            if isinstance(item, dict) and item.get("url"):
-                text = json3_url_to_text(item["url"])
-                if text:
-                    return TranscriptResult(language=str(lang), text=text, method="yt-dlp")
+        return transcript_from_subtitles(subtitle_meta, preferred_langs)
 
     return None
 
 
+_YDL_LOCAL = threading.local()
+
+
+def resolve_subtitles_lib(video_ids: List[str], preferred_langs: List[str]) -> Dict[str, Dict[str, Any]]:
+    """requested_subtitles per video through the yt_dlp library, reusing one YoutubeDL per thread.
+
+    Every HTTP request the extractor makes (watch page, player API, ...) goes through HOST_LIMITER.
+    """
+    import yt_dlp
+
+    ydl = getattr(_YDL_LOCAL, "ydl", None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(
+            {
+                "skip_download": True,
+                "writesubtitles": True,
+                "writeautomaticsub": True,
+                "subtitleslangs": preferred_langs,
+                "subtitlesformat": "json3",
+                "quiet": True,
+                "no_warnings": True,
+            }
+        )
+        urlopen = ydl.urlopen
+
+        def limited_urlopen(req: Any) -> Any:
+            url = req if isinstance(req, str) else getattr(req, "url", None) or req.get_full_url()
+            HOST_LIMITER.wait(url)
+            return urlopen(req)
+
+        ydl.urlopen = limited_urlopen
+        _YDL_LOCAL.ydl = ydl
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for vid in video_ids:
+        url = f"https://www.youtube.com/watch?v={vid}"
+        try:
+            info = ydl.extract_info(url, download=False)
+        except Exception:
+            continue
+        subs = info.get("requested_subtitles") if isinstance(info, dict) else None
+        out[vid] = subs if isinstance(subs, dict) else {}
+    return out
+
+
+def resolve_subtitles_cli(
+    ytdlp: str, video_ids: List[str], preferred_langs: List[str], parallel: int = 1
+) -> Dict[str, Dict[str, Any]]:
+    """requested_subtitles per video from a single yt-dlp process; one `<id> <json>` line per resolved video.
+
+    The process cannot share HOST_LIMITER, so with `parallel` processes running each one spaces its
+    requests parallel/rps apart to keep the combined rate at --host-rps.
+    """
+    urls = [f"https://www.youtube.com/watch?v={vid}" for vid in video_ids]
+    cmd = [ytdlp] + ytdlp_subtitle_args(preferred_langs) + ["--ignore-errors", "--no-warnings"]
+    cmd += ["--print", "%(id)s %(requested_subtitles)j"]
+    if HOST_LIMITER.interval > 0:
+        cmd += ["--sleep-requests", f"{HOST_LIMITER.interval * max(1, parallel):g}"]
+    cmd += urls
+
+    HOST_LIMITER.wait(urls[0])
+    try:
+        # --ignore-errors: a non-zero exit only means some videos failed; parse what was printed
+        stdout = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=90 + 30 * len(video_ids)).stdout
+    except subprocess.TimeoutExpired as e:
+        # Keep the videos resolved before the timeout; captured output is bytes here even with text=True.
+        raw = e.stdout or b""
+        stdout = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
+    except Exception:
+        return {}
+
+    wanted = set(video_ids)
+    out: Dict[str, Dict[str, Any]] = {}
+    for line in stdout.splitlines():
+        vid, _, raw = line.strip().partition(" ")
+        if vid not in wanted:
+            continue
+        try:
+            meta = json.loads(raw)
+        except ValueError:
+            continue
+        out[vid] = meta if isinstance(meta, dict) else {}
+    return out
+
+
+def resolve_subtitles(
+    video_ids: List[str], preferred_langs: List[str], batch_size: int, concurrency: int
+) -> Tuple[Optional[Dict[str, Dict[str, Any]]], str]:
+    """Subtitle metadata for many videos without a yt-dlp process per video.
+
+    Returns (video_id -> requested_subtitles, backend). Videos yt-dlp could not resolve are absent;
+    None means no yt-dlp is available at all.
+    """
+    try:
+        import yt_dlp  # noqa: F401
+
+        def resolve(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+            return resolve_subtitles_lib(batch, preferred_langs)
+
+        backend = "yt_dlp-lib"
+    except ImportError:
+        ytdlp = shutil.which("yt-dlp")
+        if not ytdlp:
+            return None, "none"
+
+        def resolve(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+            return resolve_subtitles_cli(ytdlp, batch, preferred_langs, workers)
+
+        backend = "yt-dlp-cli"
+
+    batches = [video_ids[i : i + batch_size] for i in range(0, len(video_ids), batch_size)]
+    workers = max(1, min(concurrency, len(batches)))
+    out: Dict[str, Dict[str, Any]] = {}
+    if workers == 1:
+        for batch in batches:
+            out.update(resolve(batch))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(resolve, batches):
+                out.update(part)
+    return out, backend
+
+
 def json3_url_to_text(url: str) -> str:
     try:
         raw = http_get(url, timeout=30)
@@ -497,70 +716,373 @@ def extract_transcript_with_watch_page(video_id: str, preferred_langs: List[str]
     return None
 
 
-def transcript_for_video(video_id: str, preferred_langs: List[str]) -> Optional[TranscriptResult]:
+class TranscriptCache:
+    """SQLite store of transcripts keyed by (video_id, language), plus the last candidate list per feed.
+
+    mode: "use" reads then stores, "refresh" only stores, "cache-only" only reads.
+    Once the stored text exceeds max_bytes the least recently used transcripts are evicted.
+    """
+
+    def __init__(self, path: Path, mode: str = "use", max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._con = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+              video_id TEXT NOT NULL,
+              language TEXT NOT NULL,
+              method TEXT NOT NULL,
+              raw_text TEXT NOT NULL,
+              text TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              created_at REAL NOT NULL,
+              last_used REAL NOT NULL,
+              PRIMARY KEY (video_id, language)
+            )
+            """
+        )
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_last_used ON transcripts(last_used)")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS feeds (feed_key TEXT PRIMARY KEY, videos TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._total = int(self._con.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0])
+
+    def _usable(self, rows: List[Tuple[Any, ...]], preferred_langs: List[str]) -> List[Tuple[Any, ...]]:
+        """Rows in a requested language, most preferred first; with cache-only any language is a last resort."""
+        rank = {lang: i for i, lang in enumerate(preferred_langs)}
+        if self.mode != "cache-only":
+            rows = [r for r in rows if r[0] in rank]
+        return sorted(rows, key=lambda r: rank.get(r[0], len(rank)))
+
+    def get(self, video_id: str, preferred_langs: List[str]) -> Optional[TranscriptResult]:
+        """Cached transcript in the most preferred language available; other languages only count under cache-only."""
+        if self.mode == "refresh":
+            return None
+        with self._lock:
+            rows = self._usable(
+                self._con.execute("SELECT language, method, text FROM transcripts WHERE video_id = ?", (video_id,)).fetchall(),
+                preferred_langs,
+            )
+            if not rows:
+                self.misses += 1
+                return None
+            lang, method, text = rows[0]
+            self._con.execute(
+                "UPDATE transcripts SET last_used = ? WHERE video_id = ? AND language = ?", (time.time(), video_id, lang)
+            )
+            self.hits += 1
+        return TranscriptResult(language=lang, text=text, method=method, cached=True)
+
+    def put(self, video_id: str, result: TranscriptResult, raw_text: str) -> None:
+        if self.mode == "cache-only":
+            return
+        size = len(raw_text.encode("utf-8")) + len(result.text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._con.execute(
+                "SELECT size FROM transcripts WHERE video_id = ? AND language = ?", (video_id, result.language)
+            ).fetchone()
+            self._con.execute(
+                "INSERT OR REPLACE INTO transcripts"
+                " (video_id, language, method, raw_text, text, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (video_id, result.language, result.method, raw_text, result.text, size, now, now),
+            )
+            self._total += size - (int(old[0]) if old else 0)
+            self.stores += 1
+            if self._total > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target: int) -> None:
+        rows = self._con.execute("SELECT video_id, language, size FROM transcripts ORDER BY last_used ASC").fetchall()
+        doomed: List[Tuple[str, str]] = []
+        for vid, lang, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((vid, lang))
+            self._total -= int(size)
+        self._con.executemany("DELETE FROM transcripts WHERE video_id = ? AND language = ?", doomed)
+        self.evictions += len(doomed)
+
+    def has(self, video_id: str, preferred_langs: List[str]) -> bool:
+        """Whether get() would hit, without touching last_used or the hit/miss counters."""
+        if self.mode == "refresh":
+            return False
+        with self._lock:
+            rows = self._con.execute("SELECT language FROM transcripts WHERE video_id = ?", (video_id,)).fetchall()
+        return bool(self._usable(rows, preferred_langs))
+
+    def get_feed(self, feed_key: str) -> Optional[List[VideoEntry]]:
+        with self._lock:
+            row = self._con.execute("SELECT videos FROM feeds WHERE feed_key = ?", (feed_key,)).fetchone()
+        if row is None:
+            return None
+        return [VideoEntry(**v) for v in json.loads(row[0])]
+
+    def put_feed(self, feed_key: str, videos: List[VideoEntry]) -> None:
+        if self.mode == "cache-only":
+            return
+        body = json.dumps([asdict(v) for v in videos], ensure_ascii=False)
+        with self._lock:
+            self._con.execute(
+                "INSERT OR REPLACE INTO feeds (feed_key, videos, fetched_at) VALUES (?, ?, ?)", (feed_key, body, time.time())
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        self._con.close()
+
+
+def transcript_for_video(
+    video_id: str,
+    preferred_langs: List[str],
+    cache: Optional[TranscriptCache] = None,
+    subtitles: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Optional[TranscriptResult]:
+    """`subtitles`: pre-resolved requested_subtitles (resolve_subtitles); when given, yt-dlp is not spawned here."""
+    if cache is not None:
+        hit = cache.get(video_id, preferred_langs)
+        if hit is not None or cache.mode == "cache-only":
+            return hit
+
     url = f"https://www.youtube.com/watch?v={video_id}"
 
-    first = extract_transcript_with_ytdlp(url, preferred_langs)
+    if subtitles is None:
+        first = extract_transcript_with_ytdlp(url, preferred_langs)
+    elif video_id in subtitles:
+        first = transcript_from_subtitles(subtitles[video_id], preferred_langs)
+    else:
+        first = None
     if first and first.text:
-        first.text = clean_transcript_text(first.text)
+        raw = first.text
+        first.text = clean_transcript_text(raw)
+        if cache is not None:
+            cache.put(video_id, first, raw)
         return first
 
     second = extract_transcript_with_watch_page(video_id, preferred_langs)
     if second and second.text:
-        second.text = clean_transcript_text(second.text)
+        raw = second.text
+        second.text = clean_transcript_text(raw)
+        if cache is not None:
+            cache.put(video_id, second, raw)
         return second
 
     return None
 
 
-def to_markdown(query: str, keywords: List[str], videos: List[VideoEntry], transcripts: List[Tuple[VideoEntry, Optional[TranscriptResult]]]) -> str:
-    lines: List[str] = []
-    lines.append("# YouTube High-Relevance Food Video Transcripts")
-    lines.append("")
-    lines.append(f"Query: {query}")
-    lines.append(f"Keywords: {', '.join(keywords)}")
-    lines.append(f"Selected videos: {len(videos)}")
-    lines.append("")
+def iter_transcripts(
+    videos: List[VideoEntry],
+    preferred_langs: List[str],
+    concurrency: int,
+    cache: Optional[TranscriptCache] = None,
+    subtitles: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Iterator[Tuple[VideoEntry, Optional[TranscriptResult], float]]:
+    """(video, transcript, seconds) in input order, with at most 2*concurrency videos in flight.
+
+    Ordered and bounded so the report can be streamed without holding every transcript in memory.
+    """
+
+    def timed(v: VideoEntry) -> Tuple[Optional[TranscriptResult], float]:
+        t0 = time.perf_counter()
+        tr = transcript_for_video(v.video_id, preferred_langs, cache, subtitles)
+        return tr, time.perf_counter() - t0
+
+    if concurrency <= 1 or len(videos) <= 1:
+        for v in videos:
+            tr, sec = timed(v)
+            yield v, tr, sec
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(videos)))
+    pending: Deque[Tuple[VideoEntry, Future[Tuple[Optional[TranscriptResult], float]]]] = deque()
+    try:
+        for v in videos:
+            pending.append((v, pool.submit(timed, v)))
+            if len(pending) >= concurrency * 2:
+                head, fut = pending.popleft()
+                yield (head, *fut.result())
+        while pending:
+            head, fut = pending.popleft()
+            yield (head, *fut.result())
+    finally:
+        # an interrupted run should not start the queued videos
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def cached_feed(cache: Optional[TranscriptCache], feed_key: str, fetch: Callable[[], List[VideoEntry]]) -> List[VideoEntry]:
+    """Fetch a candidate feed and remember it; with --cache-only, replay the remembered one instead."""
+    if cache is not None and cache.mode == "cache-only":
+        videos = cache.get_feed(feed_key)
+        if videos is None:
+            raise LookupError(f"feed not cached: {feed_key}")
+        return videos
+    videos = fetch()
+    if cache is not None:
+        cache.put_feed(feed_key, videos)
+    return videos
 
-    lines.append("## Ranked Videos")
-    lines.append("")
-    for idx, v in enumerate(videos, start=1):
-        lines.append(f"{idx}. [{v.title}]({v.link}) (score={v.score})")
-        if v.channel:
-            lines.append(f"   - Channel: {v.channel}")
 
-    lines.append("")
-    lines.append("## Transcripts")
-    lines.append("")
+def load_sync_state(path: Path) -> Dict[str, Any]:
+    state: Dict[str, Any] = {"playlists": {}, "report_sections": 0}
+    if path.exists():
+        try:
+            state.update(json.loads(path.read_text(encoding="utf-8")))
+        except ValueError:
+            pass
+    return state
 
-    for idx, (v, tr) in enumerate(transcripts, start=1):
-        lines.append(f"### {idx}. {v.title}")
-        lines.append(f"- URL: {v.link}")
-        lines.append(f"- Relevance score: {v.score}")
-        lines.append(f"- Published: {v.published or 'N/A'}")
 
-        if tr is None:
-            lines.append("- Transcript: unavailable")
-            lines.append("")
-            continue
+def save_sync_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def sync_playlist(playlist_id: str, entry: Dict[str, Any], cache: Optional[TranscriptCache]) -> Tuple[List[VideoEntry], str, str]:
+    """Unseen videos of one playlist via a conditional feed request; also returns the new validators.
+
+    The caller stores the validators only once every returned video has been processed, so a capped
+    run (--max-videos) does not turn the leftovers into a 304 next time.
+    """
+    body, etag, last_modified = http_get_conditional(
+        playlist_feed_url(playlist_id), entry.get("etag", ""), entry.get("last_modified", "")
+    )
+    entry["checked_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    if body is None:
+        return [], etag, last_modified
+    videos = parse_playlist_feed(body)
+    if cache is not None:
+        cache.put_feed(f"playlist:{playlist_id}", videos)
+    seen = set(entry.get("seen", []))
+    return [v for v in videos if v.video_id not in seen], etag, last_modified
+
+
+def timing_summary(timings: List[Tuple[VideoEntry, str, float]], wall: float, concurrency: int) -> str:
+    """timings: (video, method label, seconds) per video in report order."""
+    total = sum(t[2] for t in timings)
+    lines = [f"Transcript timing: wall={wall:.1f}s sum={total:.1f}s concurrency={concurrency} (*=cached)"]
+    for idx, (v, method, sec) in enumerate(timings, start=1):
+        lines.append(f"{idx:>4}. {sec:7.1f}s  {method:<11} {v.video_id}  {v.title}")
+    return "\n".join(lines)
 
-        lines.append(f"- Transcript language: {tr.language}")
-        lines.append(f"- Extract method: {tr.method}")
-        draft = draft_copy_from_transcript(tr.text, keywords)
-        if draft:
-            lines.append("")
-            lines.append("#### 文案草稿")
-            lines.append("")
-            lines.append("```text")
-            lines.append(textwrap.fill(draft, width=120))
-            lines.append("```")
+
+def video_section_lines(idx: int, v: VideoEntry, tr: Optional[TranscriptResult], keywords: List[str]) -> List[str]:
+    lines: List[str] = []
+    lines.append(f"### {idx}. {v.title}")
+    lines.append(f"- URL: {v.link}")
+    lines.append(f"- Relevance score: {v.score}")
+    lines.append(f"- Published: {v.published or 'N/A'}")
+
+    if tr is None:
+        lines.append("- Transcript: unavailable")
+        lines.append("")
+        return lines
+
+    lines.append(f"- Transcript language: {tr.language}")
+    lines.append(f"- Extract method: {tr.method}")
+    draft = draft_copy_from_transcript(tr.text, keywords)
+    if draft:
+        lines.append("")
+        lines.append("#### 文案草稿")
         lines.append("")
         lines.append("```text")
-        lines.append(textwrap.fill(tr.text, width=120))
+        lines.append(textwrap.fill(draft, width=120))
         lines.append("```")
+    lines.append("")
+    lines.append("```text")
+    lines.append(textwrap.fill(tr.text, width=120))
+    lines.append("```")
+    lines.append("")
+    return lines
+
+
+class MarkdownReportWriter:
+    """Streams a report to disk instead of building it in memory.
+
+    The preamble (header and ranked list, both known up front) is written first, then one section per
+    video as soon as its transcript arrives, and the transcript index on finish(). Every section is
+    flushed when written, so an interrupted run leaves all finished sections in the file (without the index).
+    """
+
+    def __init__(self, path: Path, keywords: List[str], start: int = 1) -> None:
+        self.path = path
+        self.keywords = keywords
+        self.next_idx = start
+        self.index: List[str] = []
+        self.video_ids: List[str] = []
+        self.ok = 0
+        self.index_heading = "## Transcript Index"
+        self.f: Optional[IO[str]] = None
+
+    def begin(self, query: str, videos: List[VideoEntry]) -> None:
+        """Start a new report, replacing any existing file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.f = self.path.open("w", encoding="utf-8")
+        lines: List[str] = []
+        lines.append("# YouTube High-Relevance Food Video Transcripts")
+        lines.append("")
+        lines.append(f"Query: {query}")
+        lines.append(f"Keywords: {', '.join(self.keywords)}")
+        lines.append(f"Selected videos: {len(videos)}")
         lines.append("")
 
-    return "\n".join(lines)
+        lines.append("## Ranked Videos")
+        lines.append("")
+        for idx, v in enumerate(videos, start=1):
+            lines.append(f"{idx}. [{v.title}]({v.link}) (score={v.score})")
+            if v.channel:
+                lines.append(f"   - Channel: {v.channel}")
+
+        lines.append("")
+        lines.append("## Transcripts")
+        lines.append("")
+        self._write(lines)
+
+    def begin_append(self, count: int) -> None:
+        """Continue an existing report with a dated block of `count` new sections."""
+        stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.index_heading = "### Transcript Index"
+        self.f = self.path.open("a", encoding="utf-8")
+        self._write(["", f"## Synced {stamp} ({count} new)", ""])
+
+    def add(self, v: VideoEntry, tr: Optional[TranscriptResult]) -> None:
+        self._write(video_section_lines(self.next_idx, v, tr, self.keywords))
+        status = f"{tr.language} / {tr.method}" if tr else "unavailable"
+        self.index.append(f"{self.next_idx}. {v.title} — {status}")
+        self.video_ids.append(v.video_id)
+        self.ok += 1 if tr and tr.text else 0
+        self.next_idx += 1
+
+    def finish(self) -> None:
+        self._write([self.index_heading, "", f"Transcripts: {self.ok}/{len(self.index)}", ""] + self.index)
+        self.close()
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def _write(self, lines: List[str]) -> None:
+        assert self.f is not None
+        self.f.write("\n".join(lines) + "\n")
+        self.f.flush()
 
 
 def main() -> int:
@@ -569,18 +1091,42 @@ def main() -> int:
     keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
     negative_keywords = split_keywords(args.negative_keywords)
     prefer_langs = [x.strip() for x in args.prefer_lang.split(",") if x.strip()]
+    HOST_LIMITER.set_rps(args.host_rps)
+    cache: Optional[TranscriptCache] = None
+    if args.transcript_cache:
+        cache = TranscriptCache(
+            Path(args.transcript_cache),
+            mode="refresh" if args.refresh else "cache-only" if args.cache_only else "use",
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        )
+    elif args.cache_only:
+        print("--cache-only needs --transcript-cache", file=sys.stderr)
+        return 2
+    if args.sync and (not args.playlist_url or args.cache_only):
+        print("--sync needs --playlist-url and network access (not --cache-only)", file=sys.stderr)
+        return 2
+
+    out_path = Path(args.output)
+    state_path = Path(args.sync_state) if args.sync_state else out_path.with_name(out_path.name + ".sync.json")
+    state = load_sync_state(state_path) if args.sync else {}
+    synced: Dict[str, Tuple[List[str], str, str]] = {}
 
     ranked: List[VideoEntry] = []
     source = ""
     if args.playlist_url:
-        source = "playlist-feed"
+        source = "playlist-sync" if args.sync else "playlist-feed"
         playlist_videos: List[VideoEntry] = []
         for u in args.playlist_url:
             pid = playlist_id_from_url(u.strip())
             if not pid:
                 continue
             try:
-                playlist_videos.extend(fetch_playlist_feed(pid))
+                if args.sync:
+                    new, etag, last_modified = sync_playlist(pid, state["playlists"].setdefault(pid, {}), cache)
+                    synced[pid] = ([v.video_id for v in new], etag, last_modified)
+                    playlist_videos.extend(new)
+                else:
+                    playlist_videos.extend(cached_feed(cache, f"playlist:{pid}", lambda: fetch_playlist_feed(pid)))
             except Exception:
                 continue
         dedup = {}
@@ -612,11 +1158,15 @@ def main() -> int:
     else:
         feed_videos: List[VideoEntry] = []
         try:
-            feed_videos = fetch_feed(args.query)
+            feed_videos = cached_feed(cache, f"search:{args.query}", lambda: fetch_feed(args.query))
             source = "youtube-feed"
         except Exception:
             try:
-                feed_videos = fetch_bing_youtube_candidates(args.query, count=max(10, args.feed_limit))
+                feed_videos = cached_feed(
+                    cache,
+                    f"bing:{args.query}",
+                    lambda: fetch_bing_youtube_candidates(args.query, count=max(10, args.feed_limit)),
+                )
                 source = "bing-rss-fallback"
             except Exception as e:
                 print(f"Failed to fetch candidates from YouTube and Bing fallback: {e}", file=sys.stderr)
@@ -632,19 +1182,54 @@ def main() -> int:
             strict_relevance=args.strict_relevance,
         )
 
-    transcripts: List[Tuple[VideoEntry, Optional[TranscriptResult]]] = []
-    for v in ranked:
-        tr = transcript_for_video(v.video_id, prefer_langs)
-        transcripts.append((v, tr))
-
-    md = to_markdown(args.query, keywords, ranked, transcripts)
-
-    out_path = Path(args.output)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(md, encoding="utf-8")
-
-    ok_count = sum(1 for _, tr in transcripts if tr and tr.text)
-    print(f"Saved report to {out_path} (source={source}, videos={len(ranked)}, transcripts={ok_count})")
+    concurrency = max(1, args.concurrency)
+    t0 = time.perf_counter()
+    subtitles: Optional[Dict[str, Dict[str, Any]]] = None
+    backend = "per-video"
+    pending = [v.video_id for v in ranked if cache is None or not cache.has(v.video_id, prefer_langs)]
+    if args.ytdlp_batch_size > 0 and pending and not args.cache_only:
+        subtitles, backend = resolve_subtitles(pending, prefer_langs, args.ytdlp_batch_size, concurrency)
+    resolve_sec = time.perf_counter() - t0
+    append = args.sync and out_path.exists()
+    writer = MarkdownReportWriter(out_path, keywords, start=int(state.get("report_sections", 0)) + 1 if append else 1)
+    timings: List[Tuple[VideoEntry, str, float]] = []
+    transcripts = iter_transcripts(ranked, prefer_langs, concurrency, cache, subtitles)
+    try:
+        if not append:
+            writer.begin(args.query, ranked)
+        elif ranked:
+            writer.begin_append(len(ranked))
+        for v, tr, sec in transcripts:
+            writer.add(v, tr)
+            timings.append((v, (f"{tr.method}*" if tr.cached else tr.method) if tr else "unavailable", sec))
+        if writer.f is not None:
+            writer.finish()
+    finally:
+        # Closing the generator waits for its worker threads, which write to the cache.
+        transcripts.close()
+        writer.close()
+        if cache is not None:
+            cache.close()
+        if args.sync:
+            # record what actually reached the report, also when the run was interrupted
+            state["report_sections"] = writer.next_idx - 1
+            done = set(writer.video_ids)
+            for pid, (new_ids, etag, last_modified) in synced.items():
+                entry = state["playlists"][pid]
+                seen = entry.get("seen", []) + [vid for vid in new_ids if vid in done]
+                entry["seen"] = seen[-SYNC_SEEN_LIMIT:]
+                if all(vid in done for vid in new_ids):
+                    entry["etag"] = etag
+                    entry["last_modified"] = last_modified
+            save_sync_state(state_path, state)
+    wall = time.perf_counter() - t0
+
+    print(f"Saved report to {out_path} (source={source}, videos={len(ranked)}, transcripts={writer.ok})")
+    if subtitles is not None:
+        print(f"Subtitle metadata: backend={backend} resolved={len(subtitles)}/{len(pending)} in {resolve_sec:.1f}s")
+    print(timing_summary(timings, wall, concurrency))
+    if cache is not None:
+        print(f"Transcript cache: {json.dumps(cache.stats())}")
     return 0
 
 